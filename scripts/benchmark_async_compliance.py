@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Async Compliance Benchmark - Compare LegalComplianceEngine with AsyncLegalComplianceEngine
+Serves robots.txt and article pages from local stand-in HTTP servers (one per "domain")
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from legal_compliance import LegalComplianceEngine
+from async_legal_compliance import AsyncLegalComplianceEngine
+
+ARTICLE_HTML = (
+    "<html><head><title>Stand-in article</title><style>p{}</style></head>"
+    "<body><h1>Heading</h1>" + "<p>Lorem ipsum dolor sit amet.</p>" * 50 + "</body></html>"
+).encode("utf-8")
+
+
+def make_handler(latency: float):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path == "/robots.txt":
+                body = b"User-agent: *\nDisallow: /private/\nCrawl-delay: 1\n"
+                content_type = "text/plain"
+            else:
+                body = ARTICLE_HTML
+                content_type = "text/html; charset=utf-8"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StandInHandler
+
+
+def start_servers(count: int, latency: float) -> Tuple[List[ThreadingHTTPServer], List[str]]:
+    servers, bases = [], []
+    for _ in range(count):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        bases.append(f"http://127.0.0.1:{server.server_address[1]}")
+    return servers, bases
+
+
+def build_urls(bases: List[str], per_domain: int) -> List[str]:
+    # Interleave domains the way a frontier would hand them out
+    return [f"{base}/post/{i}" for i in range(per_domain) for base in bases]
+
+
+def run_sync(urls: List[str]) -> float:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engine = LegalComplianceEngine(cache_dir=cache_dir)
+        start = time.perf_counter()
+        for url in urls:
+            engine.scrape_content(url)
+        return time.perf_counter() - start
+
+
+async def run_async(urls: List[str], concurrency: int) -> float:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        semaphore = asyncio.Semaphore(concurrency)
+        async with AsyncLegalComplianceEngine(LegalComplianceEngine(cache_dir=cache_dir)) as engine:
+
+            async def fetch(url: str) -> str:
+                async with semaphore:
+                    return await engine.scrape_content(url)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(fetch(url) for url in urls))
+            return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--domains", type=int, default=10, help="number of stand-in domains")
+    parser.add_argument("--urls-per-domain", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.05, help="server latency per request (s)")
+    parser.add_argument("--concurrency", type=int, default=200, help="async in-flight fetch limit")
+    parser.add_argument("--skip-sync", action="store_true", help="only run the async engine")
+    args = parser.parse_args()
+
+    servers, bases = start_servers(args.domains, args.latency)
+    urls = build_urls(bases, args.urls_per_domain)
+
+    print("⏱️  Async Compliance Benchmark")
+    print("=" * 50)
+    print(f"{len(urls)} URLs across {args.domains} domains, {args.latency * 1000:.0f}ms latency, crawl-delay 1s")
+
+    try:
+        async_elapsed = asyncio.run(run_async(urls, args.concurrency))
+        print(f"async: {async_elapsed:.2f}s ({len(urls) / async_elapsed:.1f} URLs/s)")
+        if not args.skip_sync:
+            sync_elapsed = run_sync(urls)
+            print(f"sync:  {sync_elapsed:.2f}s ({len(urls) / sync_elapsed:.1f} URLs/s)")
+            print(f"speedup: {sync_elapsed / async_elapsed:.1f}x")
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Concurrent Crawl Benchmark - sequential vs concurrent BlogPatternScraper.scrape_blog_patterns
+Serves one synthetic blog platform per loopback host (each with robots.txt, and a
+sitemap or topic pages linking to another platform's article too, plus a syndicated
+copy of another platform's article) behind
+a simulated latency, crawls them both ways under the real compliance engine and
+checks that both runs produce the same BlogPattern records and insights. Every
+page carries its platform's navigation, sidebar and footer, and each platform ends
+with two short notes that share little but that chrome: the crawl must keep them
+as different articles while still skipping the syndicated copies.
+Extra loopback addresses (127.0.0.2, ...) work out of the box on Linux; elsewhere
+pass --hosts with aliases that resolve to this machine.
+"""
+
+import argparse
+import http.server
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+from blog_pattern_scraper import BlogPatternScraper
+from near_duplicates import NearDuplicateIndex
+
+WORDS = [f"term{i}" for i in range(4000)]
+
+
+def article_body(title: str, words: List[str]) -> str:
+    paragraphs = "".join(f"<p>{' '.join(words[i:i + 60])}</p>" for i in range(0, len(words), 60))
+    return f"<article><h1>{title}</h1><h2>Introduction</h2>{paragraphs}<h2>Conclusion</h2></article>"
+
+
+def page_html(title: str, body: str, chrome: Tuple[str, str]) -> bytes:
+    header, footer = chrome
+    return (
+        f"<html><head><title>{title}</title><meta name='description' content='{title}'></head>"
+        f"<body>{header}{body}{footer}</body></html>"
+    ).encode("utf-8")
+
+
+def platform_chrome(rng: random.Random) -> Tuple[str, str]:
+    """Navigation and sidebar before the article, comments and footer after it"""
+    def text(count: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(count))
+
+    nav = "".join(f"<a href='/topics'>{text(2)}</a>" for _ in range(40))
+    sidebar = "".join(f"<p>{text(50)}</p>" for _ in range(8))
+    comments = "".join(f"<p>{text(30)}</p>" for _ in range(5))
+    return (
+        f"<nav>{nav}</nav><aside>{sidebar}</aside>",
+        f"<section class='comments'>{comments}</section><footer><p>{text(120)}</p></footer>",
+    )
+
+
+def build_site(
+    index: int, articles: int, use_sitemap: bool, rng: random.Random, chrome: Tuple[str, str]
+) -> Dict[str, bytes]:
+    """path -> body for one platform; "{host}" in bodies is filled in per request"""
+    site: Dict[str, bytes] = {}
+    for n in range(articles):
+        # The last two are short notes: most of their page is the platform's chrome
+        length = rng.randint(40, 60) if n >= articles - 2 else rng.randint(300, 900)
+        title = f"How to build thing {index}-{n}: a guide"
+        site[f"/p/{n}"] = page_html(title, article_body(title, [rng.choice(WORDS) for _ in range(length)]), chrome)
+    if use_sitemap:
+        site["/sitemap.xml"] = (
+            "<?xml version='1.0'?><urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+            + "".join(f"<url><loc>http://{{host}}/p/{n}</loc></url>" for n in range(articles))
+            + "</urlset>"
+        ).encode("utf-8")
+        robots = "User-agent: *\nAllow: /\nSitemap: http://{host}/sitemap.xml\n"
+    else:
+        tags = ["python", "web", "data"]
+        site["/topics"] = "".join(f"<a href='/tag/{tag}'>{tag}</a>" for tag in tags).encode("utf-8")
+        for t, tag in enumerate(tags):
+            links = "".join(f"<a href='/p/{n}'>post</a>" for n in range(t, articles, len(tags)))
+            site[f"/tag/{tag}"] = f"<html><body>{links}</body></html>".encode("utf-8")
+        robots = "User-agent: *\nAllow: /\n"
+    site["/robots.txt"] = robots.encode("utf-8")
+    return site
+
+
+def serve(host: str, site: Dict[str, bytes], latency: float) -> Tuple[http.server.HTTPServer, str]:
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = site.get(self.path.split("?")[0])
+            if body is None:
+                self.send_error(404)
+                return
+            if self.path.startswith("/p/"):
+                time.sleep(latency)
+            body = body.replace(b"{host}", self.headers.get("Host", host).encode("ascii"))
+            content_type = "text/plain" if self.path == "/robots.txt" else (
+                "application/xml" if self.path.endswith(".xml") else "text/html; charset=utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def crawl(
+    platforms: Dict[str, Dict[str, object]], articles: int, workdir: str, skip_near_duplicates: bool = True, **mode
+) -> BlogPatternScraper:
+    scraper = BlogPatternScraper(
+        http_cache_dir=None, near_duplicates=NearDuplicateIndex(), skip_near_duplicates=skip_near_duplicates
+    )
+    scraper.compliance.cache_dir = workdir
+    scraper.platforms = platforms
+    scraper.scrape_blog_patterns(max_articles_per_platform=articles, **mode)
+    return scraper
+
+
+def comparable(scraper: BlogPatternScraper) -> List[dict]:
+    return [{k: v for k, v in asdict(p).items() if k != "scraped_at"} for p in scraper.patterns]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hosts", default="127.0.0.1,127.0.0.2,127.0.0.3", help="one platform per host")
+    parser.add_argument("--articles", type=int, default=4, help="articles per platform (at least 3)")
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per article response")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--per-domain", type=int, default=2)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    rng = random.Random(42)
+    platforms: Dict[str, Dict[str, object]] = {}
+    sites = []
+    for i, host in enumerate(args.hosts.split(",")):
+        chrome = platform_chrome(rng)
+        site = build_site(i, args.articles, use_sitemap=i % 2 == 0, rng=rng, chrome=chrome)
+        if sites:  # a syndicated copy of the previous platform's second article, in this platform's chrome
+            original = sites[-1]["/p/1"].decode("utf-8")
+            body = original[original.index("<article>"):original.index("</article>") + len("</article>")]
+            body = body.replace("<h1>", "<p>Originally published elsewhere.</p><h1>")
+            site["/p/0"] = page_html("Republished", body, chrome)
+        sites.append(site)
+        _, base = serve(host, site, args.latency)
+        if "/tag/python" in site and platforms:  # an article the previous platform queued first
+            previous = platforms[f"platform_{i - 1}"]["base_url"]
+            site["/tag/python"] = site["/tag/python"].replace(
+                b"<body>", f"<body><a href='{previous}/p/1'>elsewhere</a>".encode("utf-8"))
+        platforms[f"platform_{i}"] = {
+            "base_url": base,
+            "topics_url": f"{base}/topics",
+            "article_pattern": f"{base}/p/*",
+            "allowed": True,
+        }
+
+    print("🕸️  Concurrent Crawl Benchmark")
+    print("=" * 50)
+    print(
+        f"{len(platforms)} platforms x {args.articles} articles, {args.latency * 1000:.0f}ms latency, "
+        f"concurrency {args.concurrency}, {args.per_domain} per domain"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sequential = crawl(platforms, args.articles, os.path.join(tmp, "sequential"))
+        concurrent = crawl(
+            platforms, args.articles, os.path.join(tmp, "concurrent"),
+            concurrency=args.concurrency, per_domain_concurrency=args.per_domain,
+        )
+        # Keeps near-duplicates with duplicate_of set, to see which articles were flagged
+        marked = crawl(
+            platforms, args.articles, os.path.join(tmp, "marked"), skip_near_duplicates=False,
+            concurrency=args.concurrency, per_domain_concurrency=args.per_domain,
+        )
+
+    for name, scraper in (("sequential", sequential), ("concurrent", concurrent)):
+        stats = scraper.run_stats
+        print(
+            f"{name}:  {stats['elapsed_s']:6.2f}s  {stats['articles']} articles  "
+            f"{stats['articles_per_sec']:5.2f} articles/s  {stats['patterns']} patterns"
+        )
+    print(f"speedup {sequential.run_stats['elapsed_s'] / concurrent.run_stats['elapsed_s']:.1f}x")
+
+    same_articles = sequential.run_stats["articles"] == concurrent.run_stats["articles"]
+    same_records = comparable(sequential) == comparable(concurrent)
+    same_insights = sequential.generate_insights() == concurrent.generate_insights()
+    print(f"identical articles: {same_articles}  records: {same_records}  insights: {same_insights}")
+    # Exactly the syndicated copies are near-duplicates; the short notes are not
+    copies = {f"{config['base_url']}/p/0" for config in list(platforms.values())[1:]}
+    crawled = {pattern.url for pattern in marked.patterns}
+    flagged = {pattern.url for pattern in marked.patterns if pattern.duplicate_of}
+    exact = bool(crawled & copies) and flagged == crawled & copies
+    print(f"near-duplicates: {len(flagged)} flagged, {len(crawled & copies)} syndicated copies crawled; exact: {exact}")
+    if not (same_articles and same_records and same_insights and exact):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Benchmark - Compare text-extraction backends on a page corpus
+Reports pages/sec and peak memory per backend, and checks that every backend
+extracts the same text (also on PARITY_CASES, and as the streaming extractor) and
+blog-pattern features as html.parser.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+from html_text import HTMLTextExtractor, available_backends, extract_text, parse_html
+
+# Valid markup the backends tree-build differently; text must still match everywhere
+PARITY_CASES = [
+    "<p>x</p><![CDATA[cd]]><template><p>tpl</p></template>",
+    "<div>a<template>b<template>c</template>d</template>e</div><p>f &amp; g</p>",
+    "<p>one<!-- hidden --> two</p><noscript>no js</noscript><script>var s = '</p>';</script><p>three</p>",
+    "<svg><title>icon</title></svg><p>after&nbsp;svg</p><style>p { color: red }</style>",
+    "<noscript><p>ns</p></noscript><p>x</p>",
+    "<svg><![CDATA[cd]]></svg><p>after</p>",
+    "<title>a <b>t</b> &amp; u</title><textarea><b>raw</b></textarea><p>z</p><textarea>cut &lt;",
+]
+
+
+def synthetic_corpus(pages: int) -> List[str]:
+    """Blog-like pages used when no corpus directory is given."""
+    corpus = []
+    for i in range(pages):
+        sections = "".join(
+            f"<h2>Section {s}: how to scale</h2>"
+            + "".join(f"<p>Paragraph {p} of page {i} with <a href='/post/{p}'>a link</a> &amp; text.</p>" for p in range(12))
+            + "<ul>" + "".join(f"<li>item {x}</li>" for x in range(5)) + "</ul>"
+            + "<pre><code>print('hello')</code></pre>"
+            for s in range(8)
+        )
+        corpus.append(
+            "<!DOCTYPE html><html><head>"
+            f"<title>How to build a crawler, part {i}</title>"
+            "<meta name='description' content='A guide to crawling politely'>"
+            "<link rel='canonical' href='https://example.com/post'>"
+            "<style>body { color: #333 }</style><script>var tracking = 1;</script>"
+            f"</head><body><h1>Crawler part {i}</h1>{sections}"
+            "<div class='comments-section'>Comments</div>"
+            "<button class='share-twitter'>Share</button></body></html>"
+        )
+    return corpus
+
+
+def load_corpus(directory: str) -> List[str]:
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.htm*"), recursive=True)):
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            corpus.append(fh.read())
+    return corpus
+
+
+def features(html: str, backend: str) -> str:
+    """Fingerprint of the blog-pattern features extracted from one page."""
+    from blog_pattern_scraper import BlogPatternExtractor
+
+    record = BlogPatternExtractor().extract_features(parse_html(html, backend))
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def streaming_text(html: str, chunk_size: int = 7) -> str:
+    """Text from the streaming extractor, fed in small chunks like a response body."""
+    extractor = HTMLTextExtractor()
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start:start + chunk_size])
+    return extractor.close()
+
+
+def run_backend(backend: str, corpus: List[str], rounds: int) -> Dict[str, object]:
+    """Runs in a fresh process so peak RSS belongs to this backend alone."""
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    texts = [extract_text(html, backend) for html in corpus + PARITY_CASES]  # warm-up + output check
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in corpus:
+            extract_text(html, backend)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "backend": backend,
+        "pages_per_sec": len(corpus) * rounds / elapsed,
+        "peak_rss_delta_mb": (peak_kb - baseline_kb) / 1024,
+        "text_digests": [hashlib.sha1(t.encode()).hexdigest() for t in texts],
+        "feature_digests": [features(html, backend) for html in corpus],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="directory of .html files (default: synthetic pages)")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic corpus size")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.pages)
+    backends = available_backends()
+
+    print("🧪 HTML Parser Benchmark")
+    print("=" * 50)
+    print(f"{len(corpus)} pages x {args.rounds} rounds; backends: {', '.join(backends)}")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for backend in backends:
+        with ctx.Pool(1) as pool:
+            results.append(pool.apply(run_backend, (backend, corpus, args.rounds)))
+
+    reference = next(r for r in results if r["backend"] == "html.parser")
+    for r in sorted(results, key=lambda r: -r["pages_per_sec"]):
+        text_diff = sum(a != b for a, b in zip(r["text_digests"], reference["text_digests"]))
+        text_diff += sum(extract_text(html, r["backend"]) != streaming_text(html) for html in PARITY_CASES)
+        feature_diff = sum(a != b for a, b in zip(r["feature_digests"], reference["feature_digests"]))
+        print(
+            f"{r['backend']:<12} {r['pages_per_sec']:>9.1f} pages/s  "
+            f"peak +{r['peak_rss_delta_mb']:.1f} MB  "
+            f"text mismatches: {text_diff}  feature mismatches: {feature_diff}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Robots Matcher Benchmark - CompiledRobots vs urllib.robotparser on large robots.txt files
+Generates a robots.txt with thousands of rules and times can_fetch over a URL frontier.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List
+from urllib.robotparser import RobotFileParser
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from robots_matcher import CompiledRobots
+
+USER_AGENT = "Harvest.ai/1.0 (https://harvest.ai; legal@harvest.ai) Educational Content Bot"
+
+
+def generate_robots(rules: int, wildcard_share: float, rng: random.Random) -> List[str]:
+    lines = ["User-agent: *", "Crawl-delay: 1"]
+    for i in range(rules):
+        section = f"/section-{rng.randrange(200)}"
+        if rng.random() < wildcard_share:
+            lines.append(f"Disallow: {section}/*/print-{i}$")
+        elif rng.random() < 0.2:
+            lines.append(f"Allow: {section}/public-{i}/")
+        else:
+            lines.append(f"Disallow: {section}/private-{i}/")
+    lines.append("Sitemap: https://example.com/sitemap.xml")
+    return lines
+
+
+def generate_urls(count: int, rules: int, rng: random.Random) -> List[str]:
+    urls = []
+    for _ in range(count):
+        i = rng.randrange(rules)
+        kind = rng.choice(["private", "public", "article", "print"])
+        if kind == "print":
+            path = f"/section-{rng.randrange(200)}/2024/print-{i}"
+        elif kind == "article":
+            path = f"/section-{rng.randrange(200)}/article-{i}"
+        else:
+            path = f"/section-{rng.randrange(200)}/{kind}-{i}/page"
+        urls.append(f"https://example.com{path}")
+    return urls
+
+
+# Overlapping user-agent groups: each token gets exactly its own group, else "*"
+AGENT_GROUPS = [
+    "User-agent: *", "Disallow: /all/",
+    "User-agent: bot", "Disallow: /bot/",
+    "User-agent: Harvest", "Disallow: /harvest/",
+    "User-agent: HarvestBot/2.1", "Disallow: /harvestbot/",
+]
+AGENT_CASES = {
+    "HarvestBot/2.1 (+https://harvest.ai)": "/harvestbot/",
+    "harvest": "/harvest/",
+    "Bot": "/bot/",
+    "Harvest.ai/1.0": "/all/",
+    "OtherCrawler": "/all/",
+}
+
+
+def agent_group_mismatches() -> List[str]:
+    robots = CompiledRobots()
+    robots.parse(AGENT_GROUPS)
+    paths = ["/all/", "/bot/", "/harvest/", "/harvestbot/"]
+    mismatches = []
+    for agent, blocked in AGENT_CASES.items():
+        denied = [p for p in paths if not robots.can_fetch(agent, f"https://example.com{p}x")]
+        if denied != [blocked]:
+            mismatches.append(f"{agent!r}: blocked {denied}, expected {[blocked]}")
+    return mismatches
+
+
+def time_parser(parser, urls: List[str]) -> float:
+    start = time.perf_counter()
+    for url in urls:
+        parser.can_fetch(USER_AGENT, url)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=5000, help="rule lines in robots.txt")
+    parser.add_argument("--urls", type=int, default=20000, help="URLs to check")
+    parser.add_argument("--wildcard-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lines = generate_robots(args.rules, args.wildcard_share, rng)
+    urls = generate_urls(args.urls, args.rules, rng)
+
+    print("🤖 Robots Matcher Benchmark")
+    print("=" * 50)
+    print(f"{len(lines)} robots.txt lines, {len(urls)} URLs")
+
+    start = time.perf_counter()
+    stdlib = RobotFileParser()
+    stdlib.parse(lines)
+    stdlib_parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = CompiledRobots()
+    compiled.parse(lines)
+    compiled.can_fetch(USER_AGENT, urls[0])  # builds the per-agent index
+    compiled_parse = time.perf_counter() - start
+
+    stdlib_time = time_parser(stdlib, urls)
+    compiled_time = time_parser(compiled, urls)
+
+    # The stdlib parser uses first-match and no wildcards, so only plain rules can agree
+    plain = [u for u in urls if "/print-" not in u]
+    disagreements = sum(stdlib.can_fetch(USER_AGENT, u) != compiled.can_fetch(USER_AGENT, u) for u in plain)
+
+    print(f"stdlib:   parse {stdlib_parse * 1000:.1f}ms, {len(urls) / stdlib_time:,.0f} URLs/s")
+    print(f"compiled: parse {compiled_parse * 1000:.1f}ms, {len(urls) / compiled_time:,.0f} URLs/s")
+    print(f"speedup: {stdlib_time / compiled_time:.1f}x")
+    print(f"decisions differing on plain (non-wildcard) rules: {disagreements}/{len(plain)}")
+
+    mismatches = agent_group_mismatches()
+    print(f"user-agent group selection: {len(AGENT_CASES) - len(mismatches)}/{len(AGENT_CASES)} correct")
+    for mismatch in mismatches:
+        print(f"  ❌ {mismatch}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
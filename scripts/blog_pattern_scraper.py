@@ -4,11 +4,19 @@ Blog Pattern Scraper - Analyze blog post structures from popular platforms
 Uses Harvest.ai's legal compliance framework for ethical scraping
 """
 
+import argparse
+import asyncio
 import json
-import time
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from fnmatch import fnmatch
+from itertools import islice
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urlparse, urljoin
 from dataclasses import dataclass
 import sys
@@ -19,12 +27,25 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 try:
     from legal_compliance import LegalComplianceEngine
+    from async_legal_compliance import AsyncLegalComplianceEngine
+    from extraction_pipeline import ExtractionPipeline, PipelineResult
+    from html_text import parse_html, resolve_backend, soup_text
+    from http_transport import HttpTransport
+    from http_cache import ResponseCache
+    from url_frontier import UrlFrontier
+    from near_duplicates import NearDuplicateIndex, minhash_signature
 except ImportError:
     # Fallback for when running from scripts directory
     import sys
     sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
     from legal_compliance import LegalComplianceEngine
-import requests
+    from async_legal_compliance import AsyncLegalComplianceEngine
+    from extraction_pipeline import ExtractionPipeline, PipelineResult
+    from html_text import parse_html, resolve_backend, soup_text
+    from http_transport import HttpTransport
+    from http_cache import ResponseCache
+    from url_frontier import UrlFrontier
+    from near_duplicates import NearDuplicateIndex, minhash_signature
 from bs4 import BeautifulSoup
 
 # Configure logging
@@ -43,180 +64,22 @@ class BlogPattern:
     seo_patterns: Dict[str, any]
     engagement_metrics: Dict[str, any]
     scraped_at: datetime
+    duplicate_of: Optional[str] = None  # URL of an earlier near-identical article (syndication, cross-post)
 
 
-class BlogPatternScraper:
-    """Scrapes and analyzes blog post patterns from popular platforms"""
+class BlogPatternExtractor:
+    """CPU-bound feature passes over a parsed article; no network or shared state,
+    so it also runs inside process-pool workers (see extract_page_features)"""
     
-    def __init__(self):
-        self.compliance = LegalComplianceEngine()
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Harvest.ai/1.0 Blog Pattern Analyzer (https://harvest.ai; legal@harvest.ai)"
-        })
-        
-        # Target platforms for blog analysis
-        self.platforms = {
-            "medium": {
-                "base_url": "https://medium.com",
-                "topics_url": "https://medium.com/topics",
-                "article_pattern": "https://medium.com/*/*",
-                "allowed": True  # We'll check compliance per URL
-            },
-            "dev_to": {
-                "base_url": "https://dev.to",
-                "topics_url": "https://dev.to/tags",
-                "article_pattern": "https://dev.to/*/*",
-                "allowed": True
-            },
-            "hashnode": {
-                "base_url": "https://hashnode.com",
-                "topics_url": "https://hashnode.com/topics",
-                "article_pattern": "https://hashnode.com/*/*",
-                "allowed": True
-            }
+    def extract_features(self, soup: BeautifulSoup) -> Dict[str, Dict[str, any]]:
+        """All pattern features of one article, keyed like the BlogPattern fields"""
+        return {
+            "title_pattern": self._extract_title_pattern(soup),
+            "section_structure": self._extract_section_structure(soup),
+            "content_patterns": self._extract_content_patterns(soup),
+            "seo_patterns": self._extract_seo_patterns(soup),
+            "engagement_metrics": self._extract_engagement_metrics(soup),
         }
-        
-        self.patterns = []
-        
-    def scrape_blog_patterns(self, max_articles_per_platform: int = 10) -> List[BlogPattern]:
-        """Scrape blog post patterns from all platforms"""
-        logger.info("Starting blog pattern analysis...")
-        
-        for platform_name, platform_config in self.platforms.items():
-            logger.info(f"Analyzing {platform_name}...")
-            
-            try:
-                # Check compliance for the platform
-                allowed, info = self.compliance.check_compliance(platform_config["topics_url"])
-                
-                if not allowed:
-                    logger.warning(f"Skipping {platform_name}: {info.get('message', 'Not allowed')}")
-                    continue
-                
-                # Get popular topics/categories
-                topics = self._get_popular_topics(platform_config["topics_url"])
-                
-                # Analyze articles from each topic
-                for topic in topics[:3]:  # Limit to 3 topics per platform
-                    articles = self._get_articles_from_topic(topic, max_articles_per_platform // 3)
-                    
-                    for article_url in articles:
-                        pattern = self._analyze_article_pattern(platform_name, article_url)
-                        if pattern:
-                            self.patterns.append(pattern)
-                            
-                        # Respect rate limits
-                        time.sleep(2)
-                        
-            except Exception as e:
-                logger.error(f"Error analyzing {platform_name}: {e}")
-                continue
-                
-        logger.info(f"Completed analysis. Found {len(self.patterns)} patterns.")
-        return self.patterns
-    
-    def _get_popular_topics(self, topics_url: str) -> List[str]:
-        """Get popular topics/categories from a platform"""
-        try:
-            response = self.session.get(topics_url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract topic URLs (this will need platform-specific selectors)
-            topics = []
-            
-            # Generic approach - look for links that might be topics
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if '/tag/' in href or '/topic/' in href or '/category/' in href:
-                    full_url = urljoin(topics_url, href)
-                    topics.append(full_url)
-                    
-            return topics[:10]  # Limit to 10 topics
-            
-        except Exception as e:
-            logger.error(f"Error getting topics from {topics_url}: {e}")
-            return []
-    
-    def _get_articles_from_topic(self, topic_url: str, max_articles: int) -> List[str]:
-        """Get article URLs from a specific topic"""
-        try:
-            response = self.session.get(topic_url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            articles = []
-            
-            # Look for article links
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if self._is_article_url(href):
-                    full_url = urljoin(topic_url, href)
-                    articles.append(full_url)
-                    
-                    if len(articles) >= max_articles:
-                        break
-                        
-            return articles
-            
-        except Exception as e:
-            logger.error(f"Error getting articles from {topic_url}: {e}")
-            return []
-    
-    def _is_article_url(self, href: str) -> bool:
-        """Check if a URL looks like an article"""
-        article_indicators = [
-            '/p/',  # Medium
-            '/@',   # Medium author
-            '/dev.to/',  # Dev.to
-            '/hashnode.dev/',  # Hashnode
-            '/post/',  # Generic
-            '/article/',  # Generic
-            '/blog/',  # Generic
-        ]
-        
-        return any(indicator in href for indicator in article_indicators)
-    
-    def _analyze_article_pattern(self, platform: str, article_url: str) -> Optional[BlogPattern]:
-        """Analyze the structure of a single article"""
-        try:
-            # Check compliance for this specific article
-            allowed, info = self.compliance.check_compliance(article_url)
-            
-            if not allowed:
-                logger.warning(f"Skipping article {article_url}: {info.get('message', 'Not allowed')}")
-                return None
-            
-            # Scrape the article content
-            content = self.compliance.scrape_content(article_url)
-            
-            # Parse with BeautifulSoup for structure analysis
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Extract patterns
-            title_pattern = self._extract_title_pattern(soup)
-            section_structure = self._extract_section_structure(soup)
-            content_patterns = self._extract_content_patterns(soup)
-            seo_patterns = self._extract_seo_patterns(soup)
-            engagement_metrics = self._extract_engagement_metrics(soup)
-            
-            return BlogPattern(
-                platform=platform,
-                url=article_url,
-                title_pattern=title_pattern,
-                section_structure=section_structure,
-                content_patterns=content_patterns,
-                seo_patterns=seo_patterns,
-                engagement_metrics=engagement_metrics,
-                scraped_at=datetime.now()
-            )
-            
-        except Exception as e:
-            logger.error(f"Error analyzing article {article_url}: {e}")
-            return None
     
     def _extract_title_pattern(self, soup: BeautifulSoup) -> Dict[str, any]:
         """Extract title patterns and characteristics"""
@@ -360,6 +223,486 @@ class BlogPatternScraper:
             structure[level] += 1
         
         return structure
+
+
+def article_text(soup: BeautifulSoup) -> str:
+    """Text of the article body, for near-duplicate fingerprints: the paragraphs of
+    <article> (else <main>, else the page), so a platform's navigation, sidebars
+    and footers do not make its different articles look alike"""
+    body = soup.find('article') or soup.find('main') or soup
+    paragraphs = body.find_all('p')
+    if not paragraphs:
+        return soup_text(body)
+    return " ".join(" ".join(p.get_text(" ") for p in paragraphs).split())
+
+
+def extract_page_features(
+    raw: bytes, encoding: Optional[str], parser_backend: str, num_perm: int = 64
+) -> Dict[str, Dict[str, any]]:
+    """Process-pool worker: raw page bytes in, compact feature record out
+    (plus "text_signature", the MinHash signature of the article text)"""
+    html = raw.decode(encoding or "utf-8", errors="replace")
+    soup = parse_html(html, parser_backend)
+    record = BlogPatternExtractor().extract_features(soup)
+    record["text_signature"] = minhash_signature(article_text(soup), num_perm)
+    return record
+
+
+class BlogPatternScraper(BlogPatternExtractor):
+    """Scrapes and analyzes blog post patterns from popular platforms"""
+    
+    def __init__(
+        self,
+        parser_backend: Optional[str] = None,
+        transport: Optional[HttpTransport] = None,
+        http_cache_dir: Optional[str] = "./cache/http",
+        frontier: Optional[UrlFrontier] = None,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+        skip_near_duplicates: bool = True,
+        near_duplicates_path: Optional[str] = None,
+    ):
+        # "html.parser" (default), "lxml", "selectolax" or "auto" (fastest installed)
+        self.parser_backend = resolve_backend(parser_backend)
+        # One connection pool for robots.txt, topic pages and articles; re-runs
+        # revalidate cached pages instead of downloading them again
+        if transport is None:
+            transport = HttpTransport(cache=ResponseCache(http_cache_dir) if http_cache_dir else None)
+        self.transport = transport
+        # In concurrent mode every transfer holds a fetch slot (see _fetch_slot); the
+        # engine takes it after the politeness wait, so sleeping fetches hold none
+        self.compliance = LegalComplianceEngine(
+            parser_backend=self.parser_backend, transport=self.transport, fetch_slot=self._fetch_slot
+        )
+        # Canonical URLs of articles already queued, so one article reached under several
+        # spellings or on several platforms is fetched once. Pass UrlFrontier(expected_urls=...,
+        # path=...) for large jobs: a persisted Bloom filter instead of an exact set
+        self.frontier = frontier or UrlFrontier()
+        # Canonical URLs the current run admitted. Discovery still lists them, so a
+        # platform's candidates never depend on how far other platforms have got
+        self._run_admitted: Set[str] = set()
+        # MinHash signature of every analyzed article, kept across runs. Near-duplicates of an
+        # earlier article are dropped (skip_near_duplicates) or kept with duplicate_of set.
+        # Persisted to near_duplicates_path, by default beside the compliance cache
+        if near_duplicates is None:
+            if near_duplicates_path is None:
+                cache_root = os.path.dirname(os.path.abspath(self.compliance.cache_dir))
+                near_duplicates_path = os.path.join(cache_root, "near_duplicates.json")
+            near_duplicates = NearDuplicateIndex(near_duplicates_path)
+        self.near_duplicates = near_duplicates
+        self.skip_near_duplicates = skip_near_duplicates
+        
+        # Target platforms for blog analysis
+        self.platforms = {
+            "medium": {
+                "base_url": "https://medium.com",
+                "topics_url": "https://medium.com/topics",
+                "article_pattern": "https://medium.com/*/*",
+                "allowed": True  # We'll check compliance per URL
+            },
+            "dev_to": {
+                "base_url": "https://dev.to",
+                "topics_url": "https://dev.to/tags",
+                "article_pattern": "https://dev.to/*/*",
+                "allowed": True
+            },
+            "hashnode": {
+                "base_url": "https://hashnode.com",
+                "topics_url": "https://hashnode.com/topics",
+                "article_pattern": "https://hashnode.com/*/*",
+                "allowed": True
+            }
+        }
+        
+        self.patterns = []
+        # Throughput of the last scrape: articles fetched, elapsed_s, articles_per_sec
+        self.run_stats: Dict[str, float] = {}
+        # Concurrent mode only: global and per-host fetch slots (see _fetch_slot)
+        self._global_slots: Optional[threading.Semaphore] = None
+        self._domain_slots: Dict[str, threading.Semaphore] = {}
+        self._per_domain_concurrency = 1
+        self._slots_lock = threading.Lock()
+        
+    def scrape_blog_patterns(
+        self,
+        max_articles_per_platform: int = 10,
+        concurrency: int = 1,
+        per_domain_concurrency: int = 2,
+    ) -> List[BlogPattern]:
+        """Scrape blog post patterns from all platforms.
+        With concurrency > 1 all platforms, topic pages and articles are crawled in
+        parallel: at most ``concurrency`` fetches in flight overall and
+        ``per_domain_concurrency`` per host. Records and insights match the sequential run.
+        """
+        self._run_admitted = set()
+        if concurrency > 1:
+            return self._scrape_concurrently(max_articles_per_platform, concurrency, per_domain_concurrency)
+        
+        logger.info("Starting blog pattern analysis...")
+        started = time.perf_counter()
+        fetched = 0
+        
+        for platform_name, platform_config in self.platforms.items():
+            logger.info(f"Analyzing {platform_name}...")
+            
+            try:
+                articles = self._discover_articles(platform_name, platform_config, max_articles_per_platform)
+                fetched += len(articles)
+                
+                # Pacing (crawl-delay, rate limit, adaptive backoff on errors and
+                # Retry-After) is applied per domain by self.compliance.fetch_page
+                for article_url in articles:
+                    pattern = self._analyze_article_pattern(platform_name, article_url)
+                    if pattern:
+                        self.patterns.append(pattern)
+                        
+            except Exception as e:
+                logger.error(f"Error analyzing {platform_name}: {e}")
+                continue
+                
+        self._finish_run(started, fetched)
+        return self.patterns
+    
+    def _scrape_concurrently(
+        self, max_articles_per_platform: int, concurrency: int, per_domain_concurrency: int
+    ) -> List[BlogPattern]:
+        """Concurrent mode of scrape_blog_patterns. Discovery and article fetches run on
+        threads; candidates are admitted to the frontier, and the near-duplicate index and
+        self.patterns updated, in the sequential order (platform, then article), which
+        keeps the output identical
+        """
+        logger.info(f"Starting blog pattern analysis (concurrent mode, {concurrency} fetches in flight)...")
+        started = time.perf_counter()
+        self._global_slots = threading.Semaphore(concurrency)
+        self._per_domain_concurrency = per_domain_concurrency
+        self._domain_slots = {}
+        
+        def discover(item: Tuple[str, Dict[str, any]]) -> List[str]:
+            platform_name, platform_config = item
+            logger.info(f"Discovering {platform_name} articles...")
+            try:
+                return self._discover_candidates(platform_name, platform_config, max_articles_per_platform)
+            except Exception as e:
+                logger.error(f"Error analyzing {platform_name}: {e}")
+                return []
+        
+        try:
+            platforms = list(self.platforms)
+            candidates = self._map(discover, self.platforms.items())
+            discovered = [self._admit(urls, max_articles_per_platform) for urls in candidates]
+            # Submit round-robin across platforms so every host has work queued from the start
+            jobs: List[str] = []
+            for rank in range(max(map(len, discovered), default=0)):
+                jobs.extend(articles[rank] for articles in discovered if rank < len(articles))
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="blog-crawl") as pool:
+                futures = {url: pool.submit(self._analyze_article_record, url) for url in jobs}
+                for platform_name, articles in zip(platforms, discovered):
+                    for article_url in articles:
+                        analyzed = futures[article_url].result()
+                        if analyzed is None:
+                            continue
+                        pattern = self._pattern_from_record(platform_name, article_url, *analyzed)
+                        if pattern:
+                            self.patterns.append(pattern)
+        finally:
+            self._global_slots = None
+        
+        self._finish_run(started, len(jobs))
+        return self.patterns
+    
+    def scrape_blog_patterns_pipeline(
+        self,
+        max_articles_per_platform: int = 10,
+        fetch_concurrency: int = 16,
+        cpu_workers: Optional[int] = None,
+    ) -> List[BlogPattern]:
+        """Pipeline mode: asyncio downloads feed a process pool that parses and extracts.
+        fetch_concurrency / cpu_workers set the IO/CPU split (cpu_workers defaults to
+        the core count); politeness is still enforced per domain by the compliance engine.
+        """
+        logger.info("Starting blog pattern analysis (pipeline mode)...")
+        started = time.perf_counter()
+        self._run_admitted = set()
+        
+        jobs: List[Tuple[str, str]] = []
+        for platform_name, platform_config in self.platforms.items():
+            logger.info(f"Discovering {platform_name} articles...")
+            try:
+                articles = self._discover_articles(platform_name, platform_config, max_articles_per_platform)
+            except Exception as e:
+                logger.error(f"Error analyzing {platform_name}: {e}")
+                continue
+            jobs.extend((platform_name, article_url) for article_url in articles)
+        
+        async def run() -> List[PipelineResult]:
+            async with AsyncLegalComplianceEngine(engine=self.compliance) as engine:
+                pipeline = ExtractionPipeline(
+                    fetch=engine.fetch_bytes,
+                    extract=partial(
+                        extract_page_features,
+                        parser_backend=self.parser_backend,
+                        num_perm=self.near_duplicates.num_perm,
+                    ),
+                    fetch_concurrency=fetch_concurrency,
+                    cpu_workers=cpu_workers,
+                )
+                results = await pipeline.run(url for _, url in jobs)
+                logger.info(f"Pipeline stats: {pipeline.stats}")
+                return results
+        
+        for (platform_name, _), result in zip(jobs, asyncio.run(run())):
+            if result.record is None:
+                logger.warning(f"Skipping article {result.url}: {result.error}")
+                continue
+            record = dict(result.record)
+            pattern = self._pattern_from_record(platform_name, result.url, record.pop("text_signature"), record)
+            if pattern:
+                self.patterns.append(pattern)
+        
+        self._finish_run(started, len(jobs))
+        return self.patterns
+    
+    def _finish_run(self, started: float, articles: int) -> None:
+        """Persist the frontier and near-duplicate index, record throughput and log stats"""
+        self.frontier.save()
+        self.near_duplicates.save()
+        elapsed = time.perf_counter() - started
+        self.run_stats = {
+            "articles": articles,
+            "patterns": len(self.patterns),
+            "elapsed_s": round(elapsed, 3),
+            "articles_per_sec": round(articles / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+        logger.info(
+            f"Completed analysis. Found {len(self.patterns)} patterns from {articles} articles "
+            f"in {elapsed:.1f}s ({self.run_stats['articles_per_sec']:.2f} articles/sec). "
+            f"Frontier: {self.frontier.stats()} Near-duplicates: {self.near_duplicates.stats()}"
+        )
+    
+    def _map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """[fn(item) for item in items]; in concurrent mode on one thread per item
+        (their fetches still wait for _fetch_slot), results in input order"""
+        items = list(items)
+        if self._global_slots is None or len(items) < 2:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=len(items), thread_name_prefix="blog-discovery") as pool:
+            return list(pool.map(fn, items))
+    
+    @contextmanager
+    def _fetch_slot(self, url: str) -> Iterator[None]:
+        """Concurrent mode: hold one of the host's and one of the global fetch slots.
+        Page and sitemap fetches enter it from the compliance engine, after their
+        politeness wait. The host slot is taken first, so a thread waiting for its
+        host never holds a global one
+        """
+        if self._global_slots is None:
+            yield
+            return
+        host = urlparse(url).netloc
+        with self._slots_lock:
+            domain_slots = self._domain_slots.get(host)
+            if domain_slots is None:
+                domain_slots = self._domain_slots[host] = threading.Semaphore(self._per_domain_concurrency)
+        with domain_slots, self._global_slots:
+            yield
+    
+    def _pattern_from_record(
+        self, platform: str, url: str, signature: Tuple[int, ...], features: Dict[str, Dict[str, any]]
+    ) -> Optional[BlogPattern]:
+        """BlogPattern for an analyzed article; None for a skipped near-duplicate"""
+        duplicate_of = self._check_near_duplicate(url, signature)
+        if duplicate_of and self.skip_near_duplicates:
+            return None
+        return BlogPattern(
+            platform=platform,
+            url=url,
+            scraped_at=datetime.now(),
+            duplicate_of=duplicate_of,
+            **features
+        )
+    
+    def _check_near_duplicate(self, url: str, signature: Tuple[int, ...]) -> Optional[str]:
+        """URL of an earlier article with near-identical text, else None"""
+        duplicate_of = self.near_duplicates.check(url, signature)
+        if duplicate_of:
+            action = "Skipping" if self.skip_near_duplicates else "Marking"
+            logger.info(f"{action} near-duplicate {url} (of {duplicate_of})")
+        return duplicate_of
+    
+    def _discover_articles(self, platform_name: str, platform_config: Dict[str, any], max_articles: int) -> List[str]:
+        """Compliance-checked article URLs for one platform, admitted through the frontier"""
+        return self._admit(self._discover_candidates(platform_name, platform_config, max_articles), max_articles)
+    
+    def _admit(self, candidates: List[str], max_articles: int) -> List[str]:
+        """Candidates the frontier has not seen (e.g. from an earlier platform), up to max_articles"""
+        articles = []
+        for url in candidates:
+            if len(articles) >= max_articles:
+                break
+            key = self.frontier.add(url)
+            if key:
+                self._run_admitted.add(key)
+                articles.append(url)
+        return articles
+    
+    def _discover_candidates(self, platform_name: str, platform_config: Dict[str, any], max_articles: int) -> List[str]:
+        """Article URLs for one platform that earlier runs have not queued. Reads the
+        frontier but does not add to it, so platforms can be discovered in parallel"""
+        # Check compliance for the platform
+        with self._fetch_slot(platform_config["topics_url"]):
+            allowed, info = self.compliance.check_compliance(platform_config["topics_url"])
+        
+        if not allowed:
+            logger.warning(f"Skipping {platform_name}: {info.get('message', 'Not allowed')}")
+            return []
+        
+        # Sitemaps list every article in a few requests; fall back to
+        # crawling topic pages when a platform publishes none.
+        # seen: this platform's candidates, so repeated links are listed once
+        seen = UrlFrontier(drop_params=self.frontier.drop_params, site_params=self.frontier.site_params)
+        articles = self._get_articles_from_sitemaps(platform_config, max_articles, seen)
+        if not articles:
+            articles = self._get_articles_from_topics(platform_config, max_articles, seen)
+        return articles
+    
+    def _is_new_article(self, url: str, seen: UrlFrontier) -> bool:
+        """Not already a candidate here, nor queued by an earlier run"""
+        key = seen.add(url)
+        return key is not None and (key in self._run_admitted or url not in self.frontier)
+    
+    def _get_articles_from_sitemaps(
+        self, platform_config: Dict[str, any], max_articles: int, seen: UrlFrontier
+    ) -> List[str]:
+        """Article URLs from the platform's sitemaps (streamed; stops once max_articles match)"""
+        try:
+            entries = self.compliance.iter_sitemap_entries(platform_config["base_url"])
+            urls = (entry.url for entry in entries if fnmatch(entry.url, platform_config["article_pattern"]))
+            return list(islice((url for url in urls if self._is_new_article(url, seen)), max_articles))
+        except Exception as e:
+            logger.error(f"Error reading sitemaps for {platform_config['base_url']}: {e}")
+            return []
+    
+    def _get_articles_from_topics(
+        self, platform_config: Dict[str, any], max_articles: int, seen: UrlFrontier
+    ) -> List[str]:
+        """Article URLs found by crawling popular topic pages"""
+        articles = []
+        topics = self._get_popular_topics(platform_config["topics_url"])[:3]  # Limit to 3 topics per platform
+        # Topic pages download in parallel in concurrent mode; links are taken in topic order
+        for topic, soup in zip(topics, self._map(self._fetch_topic_page, topics)):
+            if soup is not None:
+                articles.extend(self._get_articles_from_topic(topic, soup, max_articles // 3, seen))
+        return articles
+    
+    def _get_popular_topics(self, topics_url: str) -> List[str]:
+        """Get popular topics/categories from a platform"""
+        soup = self._fetch_topic_page(topics_url)
+        if soup is None:
+            return []
+        
+        # Extract topic URLs (this will need platform-specific selectors)
+        topics = []
+        seen = UrlFrontier(drop_params=self.frontier.drop_params, site_params=self.frontier.site_params)
+        
+        # Generic approach - look for links that might be topics
+        for link in soup.find_all('a', href=True):
+            href = link['href']
+            if '/tag/' in href or '/topic/' in href or '/category/' in href:
+                full_url = urljoin(topics_url, href)
+                if seen.add(full_url):
+                    topics.append(full_url)
+                
+        return topics[:10]  # Limit to 10 topics
+    
+    def _fetch_topic_page(self, topic_url: str) -> Optional[BeautifulSoup]:
+        """Parsed topic or topics-index page, or None if it could not be fetched.
+        Compliance-checked and paced like article fetches"""
+        try:
+            return self.compliance.fetch_page(topic_url).soup
+            
+        except PermissionError as e:
+            logger.warning(f"Skipping topic page {topic_url}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching topic page {topic_url}: {e}")
+            return None
+    
+    def _get_articles_from_topic(
+        self, topic_url: str, soup: BeautifulSoup, max_articles: int, seen: UrlFrontier
+    ) -> List[str]:
+        """Get article URLs from a specific topic page"""
+        articles = []
+        
+        # Look for article links
+        for link in soup.find_all('a', href=True):
+            href = link['href']
+            if self._is_article_url(href):
+                full_url = urljoin(topic_url, href)
+                if not self._is_new_article(full_url, seen):
+                    continue  # already queued or listed under this or another spelling
+                articles.append(full_url)
+                
+                if len(articles) >= max_articles:
+                    break
+                    
+        return articles
+    
+    def _is_article_url(self, href: str) -> bool:
+        """Check if a URL looks like an article"""
+        article_indicators = [
+            '/p/',  # Medium
+            '/@',   # Medium author
+            '/dev.to/',  # Dev.to
+            '/hashnode.dev/',  # Hashnode
+            '/post/',  # Generic
+            '/article/',  # Generic
+            '/blog/',  # Generic
+        ]
+        
+        return any(indicator in href for indicator in article_indicators)
+    
+    def _analyze_article_pattern(self, platform: str, article_url: str) -> Optional[BlogPattern]:
+        """Analyze the structure of a single article"""
+        try:
+            # Compliance check + single fetch; the page keeps its HTML and parse tree
+            page = self.compliance.fetch_page(article_url)
+            
+            # Fingerprint first: a syndicated copy needs no feature extraction
+            duplicate_of = self._check_near_duplicate(
+                article_url, self.near_duplicates.signature(article_text(page.soup))
+            )
+            if duplicate_of and self.skip_near_duplicates:
+                return None
+            
+            # Extract patterns
+            return BlogPattern(
+                platform=platform,
+                url=article_url,
+                scraped_at=datetime.now(),
+                duplicate_of=duplicate_of,
+                **self.extract_features(page.soup)
+            )
+            
+        except PermissionError as e:
+            logger.warning(f"Skipping article {article_url}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error analyzing article {article_url}: {e}")
+            return None
+    
+    def _analyze_article_record(self, article_url: str) -> Optional[Tuple[Tuple[int, ...], Dict[str, Dict[str, any]]]]:
+        """Concurrent mode: (text signature, features) of one article, or None.
+        The near-duplicate check is left to the caller, which applies it in order
+        """
+        try:
+            page = self.compliance.fetch_page(article_url)
+            return self.near_duplicates.signature(article_text(page.soup)), self.extract_features(page.soup)
+            
+        except PermissionError as e:
+            logger.warning(f"Skipping article {article_url}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error analyzing article {article_url}: {e}")
+            return None
     
     def save_patterns(self, filename: str = "blog_patterns.json"):
         """Save patterns to JSON file"""
@@ -374,7 +717,8 @@ class BlogPatternScraper:
                 "content_patterns": pattern.content_patterns,
                 "seo_patterns": pattern.seo_patterns,
                 "engagement_metrics": pattern.engagement_metrics,
-                "scraped_at": pattern.scraped_at.isoformat()
+                "scraped_at": pattern.scraped_at.isoformat(),
+                "duplicate_of": pattern.duplicate_of
             }
             patterns_data.append(pattern_dict)
         
@@ -384,13 +728,15 @@ class BlogPatternScraper:
         logger.info(f"Saved {len(patterns_data)} patterns to {filename}")
     
     def generate_insights(self) -> Dict[str, any]:
-        """Generate insights from collected patterns"""
-        if not self.patterns:
+        """Generate insights from collected patterns (near-duplicates count once)"""
+        originals = self._original_patterns()
+        if not originals:
             return {"error": "No patterns collected"}
         
         insights = {
-            "total_patterns": len(self.patterns),
-            "platforms_analyzed": list(set(p.platform for p in self.patterns)),
+            "total_patterns": len(originals),
+            "near_duplicates": len(self.patterns) - len(originals),
+            "platforms_analyzed": list(set(p.platform for p in originals)),
             "title_insights": self._analyze_title_insights(),
             "section_insights": self._analyze_section_insights(),
             "content_insights": self._analyze_content_insights(),
@@ -400,9 +746,13 @@ class BlogPatternScraper:
         
         return insights
     
+    def _original_patterns(self) -> List[BlogPattern]:
+        """Collected patterns minus those marked as near-duplicates"""
+        return [p for p in self.patterns if not p.duplicate_of]
+    
     def _analyze_title_insights(self) -> Dict[str, any]:
         """Analyze title patterns across all articles"""
-        titles = [p.title_pattern for p in self.patterns]
+        titles = [p.title_pattern for p in self._original_patterns()]
         
         return {
             "avg_title_length": sum(t["title_length"] for t in titles) / len(titles),
@@ -414,7 +764,7 @@ class BlogPatternScraper:
     
     def _analyze_section_insights(self) -> Dict[str, any]:
         """Analyze section structure patterns"""
-        sections = [p.section_structure for p in self.patterns]
+        sections = [p.section_structure for p in self._original_patterns()]
         
         return {
             "avg_headings": sum(s["total_headings"] for s in sections) / len(sections),
@@ -425,7 +775,7 @@ class BlogPatternScraper:
     
     def _analyze_content_insights(self) -> Dict[str, any]:
         """Analyze content patterns"""
-        contents = [p.content_patterns for p in self.patterns]
+        contents = [p.content_patterns for p in self._original_patterns()]
         
         return {
             "avg_paragraphs": sum(c["paragraph_count"] for c in contents) / len(contents),
@@ -437,7 +787,7 @@ class BlogPatternScraper:
     
     def _analyze_seo_insights(self) -> Dict[str, any]:
         """Analyze SEO patterns"""
-        seo_patterns = [p.seo_patterns for p in self.patterns]
+        seo_patterns = [p.seo_patterns for p in self._original_patterns()]
         
         return {
             "has_meta_desc_percentage": sum(1 for s in seo_patterns if s["has_meta_description"]) / len(seo_patterns) * 100,
@@ -447,7 +797,7 @@ class BlogPatternScraper:
     
     def _analyze_engagement_insights(self) -> Dict[str, any]:
         """Analyze engagement patterns"""
-        engagement = [p.engagement_metrics for p in self.patterns]
+        engagement = [p.engagement_metrics for p in self._original_patterns()]
         
         return {
             "has_social_percentage": sum(1 for e in engagement if e["has_social_sharing"]) / len(engagement) * 100,
@@ -465,13 +815,24 @@ class BlogPatternScraper:
 
 def main():
     """Main function to run the blog pattern scraper"""
+    parser = argparse.ArgumentParser(description="Analyze blog post structures from popular platforms")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="fetches in flight across all platforms (default 1: sequential)")
+    parser.add_argument("--per-domain", type=int, default=2,
+                        help="fetches in flight per host when --concurrency > 1")
+    args = parser.parse_args()
+    
     scraper = BlogPatternScraper()
     
     print("🌐 Starting Blog Pattern Analysis...")
     print("=" * 50)
     
     # Scrape patterns
-    patterns = scraper.scrape_blog_patterns(max_articles_per_platform=5)
+    patterns = scraper.scrape_blog_patterns(
+        max_articles_per_platform=5,
+        concurrency=args.concurrency,
+        per_domain_concurrency=args.per_domain,
+    )
     
     if patterns:
         # Save patterns
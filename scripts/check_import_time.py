@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Import Time Check - regression guard for the decision-only path of legal_compliance
+Runs a fresh interpreter with -X importtime that imports legal_compliance, builds an
+engine and makes blacklist and (disk-cached) robots.txt decisions. Fails if that
+pulls in the HTTP stack or an HTML parser, creates directories, or if the import
+exceeds the time budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Only needed once a page, robots.txt or sitemap is actually fetched or parsed
+DEFERRED_MODULES = (
+    "requests", "urllib3", "httpx", "aiohttp", "bs4", "lxml", "selectolax",
+    "html.parser", "xml.etree.ElementTree", "gzip", "sitemaps", "audit_log", "html_text",
+)
+
+DECISION_ONLY = """
+import json, os, sys, time
+sys.path.insert(0, {src!r})
+from legal_compliance import LegalComplianceEngine, RobotsRecord
+LegalComplianceEngine(cache_dir={unused_dir!r})
+engine = LegalComplianceEngine(cache_dir={cache_dir!r})
+engine._save_robots_record(RobotsRecord(
+    domain="example.com", robots_url="https://example.com/robots.txt", status=200,
+    lines=["User-agent: *", "Disallow: /private"], fetched_at=time.time(),
+))
+engine = LegalComplianceEngine(cache_dir={cache_dir!r})
+decisions = [
+    engine.check_compliance("https://www.facebook.com/some/page")[0],
+    engine.check_compliance("https://example.com/blog/post")[0],
+    engine.check_compliance("https://example.com/private/x")[0],
+]
+print(json.dumps({{
+    "decisions": decisions,
+    "created_dirs": os.path.exists({unused_dir!r}),
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+
+def run_once(cache_dir: str) -> Tuple[Dict[str, object], List[Tuple[str, int, int]]]:
+    """One fresh interpreter; returns its report and (module, self_us, cumulative_us) rows."""
+    code = DECISION_ONLY.format(src=SRC, cache_dir=cache_dir, unused_dir=f"{cache_dir}-unused")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return json.loads(proc.stdout), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=80.0, help="median cumulative import time of legal_compliance")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    args = parser.parse_args()
+
+    print("⏱️  legal_compliance Import Time Check")
+    print("=" * 50)
+    failures = []
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(args.runs):
+            cache_dir = os.path.join(tmp, f"run-{run}", "compliance")
+            report, rows = run_once(cache_dir)
+            timings.append(next(cum for name, _, cum in rows if name == "legal_compliance") / 1000)
+
+    if report["decisions"] != [False, True, False]:
+        failures.append(f"unexpected decisions {report['decisions']}")
+    if report["created_dirs"]:
+        failures.append("constructing the engine created its cache directory")
+
+    loaded = set(report["modules"])
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    if eager:
+        failures.append(f"decision-only path imported {', '.join(eager)}")
+    median = statistics.median(timings)
+    if median > args.budget_ms:
+        failures.append(f"import took {median:.1f}ms (budget {args.budget_ms:.0f}ms)")
+
+    print(f"import legal_compliance: median {median:.1f}ms over {args.runs} runs (budget {args.budget_ms:.0f}ms)")
+    print(f"modules loaded: {len(loaded)}")
+    print("slowest imports (self time, last run):")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[1])[:args.top]:
+        print(f"  {name:40s} {self_us / 1000:6.2f}ms  (cumulative {cumulative_us / 1000:6.2f}ms)")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ decision-only path stays lightweight")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+"""
+Adaptive Pacing - per-domain AIMD crawl-delay driven by server feedback for Harvest.ai
+The static rules (robots.txt crawl-delay, rate_limit) are the fastest a domain is
+ever crawled. On errors (5xx, 429, timeouts) or a latency rise the delay between
+requests grows multiplicatively; while the host stays healthy the request rate
+grows back additively toward that ceiling. 429/503 Retry-After is honored as-is.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+# Statuses that mean "slow down": overload, rate limiting, gateway trouble
+BACKOFF_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class PacingState:
+    """AIMD state for one domain."""
+    domain: str
+    delay: float = 0.0  # current seconds between requests; 0.0 means "at the rules' ceiling"
+    floor: float = 0.0  # the rules' own crawl delay, as last seen by crawl_delay()
+    latency_fast: float = 0.0  # EWMA tracking recent responses
+    latency_slow: float = 0.0  # EWMA baseline
+    responses: int = 0
+    backoffs: int = 0
+    retry_after_until: float = 0.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    from email.utils import parsedate_to_datetime
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now if now is not None else datetime.now(timezone.utc).timestamp()
+    return max(0.0, when.timestamp() - now)
+
+
+class AdaptivePacer:
+    """Per-domain AIMD on the crawl delay; thread-safe."""
+
+    def __init__(
+        self,
+        max_delay: float = 5.0,
+        backoff_factor: float = 2.0,
+        backoff_floor: float = 1.0,
+        additive_rate: float = 0.1,
+        latency_factor: float = 2.0,
+        min_latency: float = 0.05,
+        max_retry_after: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_delay = max_delay
+        # On a bad signal: delay = max(current delay * backoff_factor, backoff_floor)
+        self.backoff_factor = backoff_factor
+        self.backoff_floor = backoff_floor
+        # On a healthy response the request rate (1/delay) grows by this many req/s
+        self.additive_rate = additive_rate
+        # "Rising latency": recent EWMA above latency_factor x baseline (and above min_latency)
+        self.latency_factor = latency_factor
+        self.min_latency = min_latency
+        self.max_retry_after = max_retry_after
+        self.clock = clock
+        self.states: Dict[str, PacingState] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------- Public API -------------------------
+    def crawl_delay(self, domain: str, floor: float) -> float:
+        """Delay to use for the next request; never below the rules' ``floor``."""
+        with self._lock:
+            state = self.states.get(domain)
+            if state is None:
+                state = self.states[domain] = PacingState(domain)
+            state.floor = floor
+            return max(floor, state.delay)
+
+    def record(
+        self,
+        domain: str,
+        status: Optional[int],
+        latency: float,
+        retry_after: Optional[float] = None,
+    ) -> float:
+        """Feed back one response (``status=None`` for a transport error).
+        Returns seconds the domain must be left alone (Retry-After), else 0.0.
+        """
+        with self._lock:
+            state = self.states.get(domain)
+            if state is None:
+                state = self.states[domain] = PacingState(domain)
+            if not state.responses:
+                state.latency_fast = state.latency_slow = latency
+            state.responses += 1
+            state.latency_fast += 0.3 * (latency - state.latency_fast)
+            state.latency_slow += 0.05 * (latency - state.latency_slow)
+            pause = 0.0
+            if retry_after is not None and status in (429, 503):
+                pause = min(retry_after, self.max_retry_after)
+                state.retry_after_until = self.clock() + pause
+            if status is None or status in BACKOFF_STATUSES or self._latency_rising(state):
+                state.backoffs += 1
+                current = max(state.delay, state.floor)
+                state.delay = min(self.max_delay, max(current * self.backoff_factor, self.backoff_floor))
+            elif state.delay > 0:
+                delay = 1.0 / (1.0 / state.delay + self.additive_rate)
+                # Back at the rules' ceiling: their delay applies again
+                state.delay = 0.0 if delay <= max(state.floor, 0.01) else delay
+            return pause
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        now = self.clock()
+        with self._lock:
+            return {
+                domain: {
+                    "delay_s": round(state.delay, 3),
+                    "latency_ewma_s": round(state.latency_fast, 4),
+                    "latency_baseline_s": round(state.latency_slow, 4),
+                    "responses": state.responses,
+                    "backoffs": state.backoffs,
+                    "retry_after_in_s": round(max(0.0, state.retry_after_until - now), 1),
+                }
+                for domain, state in self.states.items()
+            }
+
+    # ------------------------- Internal -------------------------
+    def _latency_rising(self, state: PacingState) -> bool:
+        return (
+            state.responses > 5
+            and state.latency_fast > self.min_latency
+            and state.latency_fast > self.latency_factor * state.latency_slow
+        )
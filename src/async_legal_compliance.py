@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+"""
+Async Legal Compliance - asyncio variant of LegalComplianceEngine for Harvest.ai
+Policy decisions (blacklist, robots.txt, API preference, TOS) are delegated to a
+LegalComplianceEngine; only robots.txt and page fetches go through aiohttp, so
+hundreds of fetches across different domains can be in flight on one event loop.
+"""
+
+import asyncio
+import codecs
+import contextlib
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlparse, urlsplit
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, only needed for the async engine
+    aiohttp = None
+
+from html_text import HTMLTextExtractor
+from legal_compliance import (
+    ROBOTS_REFRESH_MAX_PENDING,
+    ComplianceRules,
+    ContentRejectedError,
+    LegalComplianceEngine,
+    RobotsRecord,
+    classify_robots_failure,
+    html_to_text,
+)
+from robots_matcher import MAX_ROBOTS_BYTES
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLegalComplianceEngine:
+    """asyncio-native compliance engine with the same semantics as the sync one."""
+
+    def __init__(
+        self,
+        engine: Optional[LegalComplianceEngine] = None,
+        max_connections: int = 256,
+        max_connections_per_host: int = 4,
+    ) -> None:
+        if aiohttp is None:
+            raise ImportError("AsyncLegalComplianceEngine requires aiohttp (pip install aiohttp)")
+        self.engine = engine or LegalComplianceEngine()
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self._http: Optional["aiohttp.ClientSession"] = None
+        # Per-domain robots.txt fetch locks with their holder/waiter counts; an entry
+        # is dropped when its last user leaves, so the map only holds active domains
+        self._robots_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+        self._background: Set["asyncio.Future[None]"] = set()
+
+    async def __aenter__(self) -> "AsyncLegalComplianceEngine":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    # ------------------------- Public API -------------------------
+    async def check_compliance(self, url: str) -> Tuple[bool, Dict[str, object]]:
+        """Async counterpart of ``LegalComplianceEngine.check_compliance``."""
+        decision = await self._evaluate(url)
+        if self.engine.audit is not None:
+            self.engine._audit(url, decision, "check")
+        return decision
+
+    async def scrape_content(self, url: str, stream: bool = False) -> str:
+        """Fetch page content after compliance checks. Returns plain text.
+        stream=True has the same size/Content-Type limits as the sync engine.
+        """
+        info = await self._prepare_fetch(url)
+        domain = str(info["domain"])
+        timings: Dict[str, float] = {}
+        async with self._timed_get(url, domain) as resp:
+            resp.raise_for_status()
+            if stream:
+                return await self._stream_text(url, resp)
+            html = await resp.text()
+        text = html_to_text(html, self.engine.parser_backend, timings)
+        self.engine._observe_extraction(domain, timings)
+        return text
+
+    async def fetch_bytes(self, url: str) -> Tuple[bytes, Optional[str]]:
+        """Compliance-checked, paced GET returning (raw body, declared charset).
+        Decoding and parsing are left to the caller, e.g. a process-pool worker.
+        """
+        info = await self._prepare_fetch(url)
+        async with self._timed_get(url, str(info["domain"])) as resp:
+            resp.raise_for_status()
+            return await resp.read(), resp.charset
+
+    async def warm_up(self, domains: Iterable[str], concurrency: int = 32, scheme: str = "https") -> Dict[str, str]:
+        """Async counterpart of ``LegalComplianceEngine.warm_up``: fetch robots.txt for
+        up to ``concurrency`` domains at once and fill the rule caches.
+        """
+        engine = self.engine
+        targets: Dict[str, str] = {}
+        for item in domains:
+            parts = urlsplit(item if "://" in item else f"{scheme}://{item}")
+            targets.setdefault(parts.netloc, parts.scheme)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def warm(domain: str, domain_scheme: str) -> str:
+            if engine._is_blacklisted(domain):
+                return engine._robots_state(domain, "blacklisted_domain")
+            async with semaphore:
+                await self._ensure_robots(domain, f"{domain_scheme}://{domain}/robots.txt")
+            engine._check_robots_txt(f"{domain_scheme}://{domain}/")
+            return engine._robots_state(domain, "")
+
+        states = await asyncio.gather(*(warm(domain, domain_scheme) for domain, domain_scheme in targets.items()))
+        return dict(zip(targets, states))
+
+    # ------------------------- Internal -------------------------
+    async def _prepare_fetch(self, url: str) -> Dict[str, object]:
+        """Compliance check plus politeness wait; returns the compliance info."""
+        allowed, info = decision = await self._evaluate(url)
+        if self.engine.audit is not None:
+            self.engine._audit(url, decision, "fetch")
+        if not allowed:
+            raise PermissionError(f"Scrape blocked: {info}")
+
+        rules: ComplianceRules = info["rules"]  # type: ignore[index]
+        self.engine._check_breaker(rules.domain)
+        crawl_delay = self.engine.pacing.crawl_delay(rules.domain, rules.crawl_delay)
+        wait = self.engine.scheduler.reserve(rules.domain, crawl_delay, rules.rate_limit)
+        self.engine.metrics.observe("politeness_wait", max(0.0, wait), rules.domain)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return info
+
+    @contextlib.asynccontextmanager
+    async def _timed_get(self, url: str, domain: str) -> AsyncIterator["aiohttp.ClientResponse"]:
+        """GET timed as the "download" phase (headers through body), labeled by status."""
+        metrics = self.engine.metrics
+        breakers = self.engine.transport.breakers
+        host = urlsplit(url).netloc
+        breakers.before_call(host)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self._get_http().get(
+                url, timeout=aiohttp.ClientTimeout(total=20), trace_request_ctx={"domain": domain}
+            ) as resp:
+                outcome = str(resp.status)
+                if resp.status >= 500:
+                    breakers.record_failure(host)
+                else:
+                    breakers.record_success(host)
+                self.engine._pace(domain, resp.status, time.perf_counter() - started, resp.headers)
+                yield resp
+                metrics.count("bytes", domain, outcome, resp.content.total_bytes)
+        except Exception as exc:
+            if outcome == "error":
+                outcome = type(exc).__name__
+                breakers.record_failure(host)
+                self.engine._pace(domain, None, time.perf_counter() - started)
+            raise
+        finally:
+            metrics.observe("download", time.perf_counter() - started, domain, outcome)
+
+    async def _stream_text(self, url: str, resp: "aiohttp.ClientResponse") -> str:
+        engine = self.engine
+        engine._check_stream_headers(url, resp.headers)
+        decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+        extractor = HTMLTextExtractor()
+        received = 0
+        async for chunk in resp.content.iter_chunked(64 * 1024):
+            received += len(chunk)
+            if received > engine.max_content_bytes:
+                raise ContentRejectedError(f"{url} exceeds max_content_bytes ({engine.max_content_bytes})")
+            extractor.feed(decoder.decode(chunk))
+        extractor.feed(decoder.decode(b"", final=True))
+        return extractor.close()
+
+    async def _evaluate(self, url: str) -> Tuple[bool, Dict[str, object]]:
+        key = self.engine._decision_key(url)
+        cached = self.engine._cached_decision(key)
+        if cached is not None:
+            self.engine._count_decision(key[0], cached)
+            return cached
+        parsed = urlparse(url)
+        if not self.engine._is_blacklisted(parsed.netloc):
+            await self._ensure_robots(parsed.netloc, f"{parsed.scheme}://{parsed.netloc}/robots.txt")
+        return self.engine._evaluate(url)
+
+    def _get_http(self) -> "aiohttp.ClientSession":
+        if self._http is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+            )
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                headers={"User-Agent": self.engine.user_agent},
+                trace_configs=[self._connect_trace()],
+            )
+        return self._http
+
+    def _connect_trace(self) -> "aiohttp.TraceConfig":
+        """Times new connections (DNS + TCP/TLS) as the "connect" phase, labeled
+        with the domain (netloc) the request's other phases use.
+        """
+        metrics = self.engine.metrics
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session: object, context: Any, params: Any) -> None:
+            context.host = (context.trace_request_ctx or {}).get("domain") or urlsplit(str(params.url)).netloc
+
+        async def on_connection_create_start(session: object, context: Any, params: object) -> None:
+            context.connect_started = time.perf_counter()
+
+        async def on_connection_create_end(session: object, context: Any, params: object) -> None:
+            metrics.observe("connect", time.perf_counter() - context.connect_started, context.host)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_start.append(on_connection_create_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        return trace
+
+    async def _ensure_robots(self, domain: str, robots_url: str) -> None:
+        engine = self.engine
+        lock, users = self._robots_locks.get(domain) or (asyncio.Lock(), 0)
+        self._robots_locks[domain] = (lock, users + 1)
+        try:
+            async with lock:
+                # May read the robots.txt disk cache: keep that off the event loop
+                loop = asyncio.get_running_loop()
+                parser, record, due = await loop.run_in_executor(None, engine._robots_lookup, domain)
+                if not due:
+                    return
+                if parser is not None and record is not None:
+                    # Stale but known good: keep serving it while a task revalidates
+                    with engine._robots_lock:
+                        if len(engine._robots_refreshing) >= ROBOTS_REFRESH_MAX_PENDING:
+                            engine.metrics.count("robots_refresh_dropped", domain)
+                            return
+                        engine._robots_refreshing.add(domain)
+                    task = asyncio.ensure_future(self._refresh_robots(domain, robots_url, record))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                    return
+                await self._refresh_robots(domain, robots_url, record)
+        finally:
+            lock, users = self._robots_locks[domain]
+            if users > 1:
+                self._robots_locks[domain] = (lock, users - 1)
+            else:
+                del self._robots_locks[domain]
+
+    async def _refresh_robots(self, domain: str, robots_url: str, record: Optional[RobotsRecord]) -> None:
+        engine = self.engine
+        started = time.perf_counter()
+        try:
+            http = self._get_http()
+            async with http.get(
+                robots_url,
+                headers=engine._robots_request_headers(record),
+                timeout=aiohttp.ClientTimeout(total=10),
+                trace_request_ctx={"domain": domain},
+            ) as resp:
+                if engine._robots_status_unreachable(resp.status):
+                    resp.raise_for_status()
+                body = bytearray()
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    body += chunk
+                    if len(body) >= MAX_ROBOTS_BYTES:
+                        break  # the rest would be ignored by the parser anyway
+                fresh = engine._robots_record_from_response(
+                    domain, robots_url, resp.status, resp.headers, bytes(body), record
+                )
+        except Exception as exc:
+            engine.metrics.observe(
+                "robots_fetch", time.perf_counter() - started, domain, classify_robots_failure(exc)
+            )
+            engine._robots_fetch_failed(domain, robots_url, record, exc)
+        else:
+            engine.metrics.observe("robots_fetch", time.perf_counter() - started, domain, str(fresh.status))
+            # Persists the record to the disk cache
+            await asyncio.get_running_loop().run_in_executor(None, engine._robots_fetch_succeeded, fresh)
+        finally:
+            with engine._robots_lock:
+                engine._robots_refreshing.discard(domain)
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+"""
+Audit Log - append-only record of compliance decisions and fetches for Harvest.ai
+Each decision (URL, domain, reason, robots.txt state, attribution requirement,
+timestamp) is buffered in memory and group-committed as JSON lines: one write
+(and optional fsync) per batch. Files rotate into size-bounded segments; sealed
+segments get a small sidecar index (time range + domains) so "what did we fetch
+from X between A and B" only opens segments that can contain matches.
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from domain_policy import normalize_host
+
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "audit-"
+
+_quote = json.encoder.encode_basestring_ascii
+_BOOL = {True: "true", False: "false"}
+
+
+@dataclass
+class AuditRecord:
+    ts: float
+    domain: str
+    url: str
+    event: str  # "check" (check_compliance) or "fetch" (page/sitemap fetch attempt)
+    allowed: bool
+    reason: str  # "" when allowed, else the check_compliance reason
+    robots_state: str
+    attribution_required: bool
+
+    def to_line(self) -> str:
+        # Hand-rolled compact JSON: several times faster than json.dumps on the
+        # flush path, and the fixed '"domain":"..."' form lets the reader prefilter lines
+        return (
+            f'{{"ts":{self.ts!r},"domain":{_quote(self.domain)},"url":{_quote(self.url)},'
+            f'"event":{_quote(self.event)},"allowed":{_BOOL[self.allowed]},'
+            f'"reason":{_quote(self.reason)},"robots_state":{_quote(self.robots_state)},'
+            f'"attribution_required":{_BOOL[self.attribution_required]}}}\n'
+        )
+
+
+class AuditLog:
+    """Buffered, segmented JSONL writer; safe to share between threads.
+
+    Records are flushed when ``flush_records`` are buffered or every
+    ``flush_interval`` seconds, whichever comes first. Each process writes its
+    own segments, so several crawlers can share one directory.
+    """
+
+    def __init__(
+        self,
+        directory: str = "./cache/audit",
+        segment_bytes: int = 64 * 1024 * 1024,
+        flush_records: int = 1000,
+        flush_interval: float = 1.0,
+        fsync: bool = True,
+    ) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self._buffer: List[AuditRecord] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._segment_seq = 0
+        self._segment: Optional[Any] = None
+        self._segment_path = ""
+        self._segment_size = 0
+        self._segment_index: Dict[str, Any] = {}
+        self.stats: Dict[str, int] = {"records": 0, "batches": 0, "segments": 0}
+        self._flusher = threading.Thread(target=self._flush_loop, name="audit-log-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # ------------------------- Public API -------------------------
+    def append(self, record: AuditRecord) -> None:
+        with self._lock:
+            if self._closed:
+                raise ValueError("AuditLog is closed")
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.flush_records
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write everything buffered so far as one batch."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if batch:
+                self._write_batch(batch)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        with self._write_lock:
+            self._seal_segment()
+        atexit.unregister(self.close)
+
+    # ------------------------- Internal -------------------------
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except OSError as exc:
+                logger.error("Audit log flush failed: %s", exc)
+
+    def _write_batch(self, batch: List[AuditRecord]) -> None:
+        """Group commit: one write (and fsync) for the whole batch; caller holds _write_lock."""
+        if self._segment is None or self._segment_size >= self.segment_bytes:
+            self._rotate()
+        data = "".join(record.to_line() for record in batch).encode("utf-8")
+        self._segment.write(data)  # type: ignore[union-attr]
+        self._segment.flush()  # type: ignore[union-attr]
+        if self.fsync:
+            os.fsync(self._segment.fileno())  # type: ignore[union-attr]
+        self._segment_size += len(data)
+        index = self._segment_index
+        index["min_ts"] = min(index.get("min_ts", batch[0].ts), min(r.ts for r in batch))
+        index["max_ts"] = max(index.get("max_ts", batch[0].ts), max(r.ts for r in batch))
+        index["domains"].update(r.domain for r in batch)
+        index["records"] += len(batch)
+        self.stats["records"] += len(batch)
+        self.stats["batches"] += 1
+
+    def _rotate(self) -> None:
+        self._seal_segment()
+        self._segment_seq += 1
+        name = f"{SEGMENT_PREFIX}{int(time.time() * 1000):013d}-{os.getpid()}-{self._segment_seq:04d}.jsonl"
+        self._segment_path = os.path.join(self.directory, name)
+        self._segment = open(self._segment_path, "ab")
+        self._segment_size = self._segment.tell()
+        self._segment_index = {"domains": set(), "records": 0}
+        self.stats["segments"] += 1
+
+    def _seal_segment(self) -> None:
+        """Close the active segment and write its sidecar index."""
+        if self._segment is None:
+            return
+        self._segment.close()
+        self._segment = None
+        index = dict(self._segment_index, domains=sorted(self._segment_index["domains"]))
+        if index["records"]:
+            tmp = f"{self._segment_path}.idx.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(index, fh)
+            os.replace(tmp, f"{self._segment_path}.idx")
+
+
+class AuditLogReader:
+    """Query sealed and active segments without touching the writer."""
+
+    def __init__(self, directory: str = "./cache/audit") -> None:
+        self.directory = directory
+
+    def query(
+        self,
+        domain: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        event: Optional[str] = None,
+        allowed: Optional[bool] = None,
+        include_subdomains: bool = False,
+    ) -> Iterator[AuditRecord]:
+        """Yield matching records, oldest segment first.
+        ``since``/``until`` are epoch seconds (inclusive / exclusive).
+        """
+        host = normalize_host(domain) if domain else None
+        needle = f'"domain":{json.dumps(host)}' if host and not include_subdomains else host
+        for path in self._segments():
+            if not self._segment_may_match(path, host, since, until, include_subdomains):
+                continue
+            with open(path, "r", encoding="utf-8", errors="replace") as fh:
+                for line in fh:
+                    if needle and needle not in line:
+                        continue  # cheap substring prefilter before JSON decoding
+                    try:
+                        record = AuditRecord(**json.loads(line))
+                    except (ValueError, TypeError):
+                        continue  # torn last line after a crash
+                    if host and not self._domain_matches(record.domain, host, include_subdomains):
+                        continue
+                    if since is not None and record.ts < since:
+                        continue
+                    if until is not None and record.ts >= until:
+                        continue
+                    if event is not None and record.event != event:
+                        continue
+                    if allowed is not None and record.allowed != allowed:
+                        continue
+                    yield record
+
+    def fetched_urls(self, domain: str, since: Optional[float] = None, until: Optional[float] = None) -> List[str]:
+        """Every URL we were allowed to fetch from ``domain`` in [since, until)."""
+        return [r.url for r in self.query(domain, since, until, event="fetch", allowed=True)]
+
+    # ------------------------- Internal -------------------------
+    def _segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, f"{SEGMENT_PREFIX}*.jsonl")))
+
+    def _segment_may_match(
+        self,
+        path: str,
+        host: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+        include_subdomains: bool,
+    ) -> bool:
+        try:
+            with open(f"{path}.idx", "r", encoding="utf-8") as fh:
+                index = json.load(fh)
+        except (OSError, ValueError):
+            return True  # active or unsealed segment: scan it
+        if since is not None and index["max_ts"] < since:
+            return False
+        if until is not None and index["min_ts"] >= until:
+            return False
+        if host:
+            domains: Set[str] = set(index["domains"])
+            return any(self._domain_matches(d, host, include_subdomains) for d in domains)
+        return True
+
+    @staticmethod
+    def _domain_matches(domain: str, host: str, include_subdomains: bool) -> bool:
+        return domain == host or (include_subdomains and domain.endswith("." + host))
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+"""
+Circuit Breaker - per-domain breakers for Harvest.ai's fetch path
+A dead or failing host trips its breaker once the failure rate over a sliding
+window crosses a threshold; further requests to it fail fast with
+CircuitOpenError instead of each waiting out a 10-20s timeout. After a cool-down
+a limited number of half-open probes decide whether it closes again. Same
+CLOSED / OPEN / HALF_OPEN model as frontend/tools/agent_boot.py, keyed by domain.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from ttl_cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request to a domain whose breaker is open."""
+
+    def __init__(self, domain: str, retry_in: float) -> None:
+        super().__init__(f"Circuit breaker OPEN for {domain}; retry in {retry_in:.1f}s")
+        self.domain = domain
+        self.retry_in = retry_in
+
+
+@dataclass
+class DomainBreaker:
+    """Breaker state for one domain."""
+    domain: str
+    state: str = CLOSED
+    calls: Deque[Tuple[float, bool]] = field(default_factory=deque)  # (time, succeeded)
+    opened_at: float = 0.0
+    open_for: float = 0.0
+    trips: int = 0
+    probes_in_flight: int = 0
+    probe_successes: int = 0
+    rejected: int = 0
+
+
+class CircuitBreakerRegistry:
+    """One breaker per domain, created on demand; thread-safe.
+
+    A closed breaker opens when, over the last ``window`` seconds (at most
+    ``window_calls`` calls), at least ``min_calls`` were made and
+    ``failure_rate`` of them failed. It stays open for ``open_for`` seconds,
+    doubling on each consecutive re-open up to ``max_open_for``; then up to
+    ``half_open_max_calls`` probes run concurrently and ``success_threshold``
+    successful probes close it (any failed probe re-opens it).
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: float = 60.0,
+        window_calls: int = 50,
+        open_for: float = 30.0,
+        max_open_for: float = 600.0,
+        half_open_max_calls: int = 1,
+        success_threshold: int = 2,
+        max_domains: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.window_calls = window_calls
+        self.open_for = open_for
+        self.max_open_for = max_open_for
+        self.half_open_max_calls = half_open_max_calls
+        self.success_threshold = success_threshold
+        self.clock = clock
+        self.breakers: TTLCache = TTLCache(max_entries=max_domains)
+        self._lock = threading.Lock()
+
+    # ------------------------- Public API -------------------------
+    def before_call(self, domain: str) -> None:
+        """Admit a request to ``domain`` or raise CircuitOpenError.
+        Every admitted call must be followed by record_success/record_failure.
+        """
+        with self._lock:
+            breaker = self._breaker(domain)
+            now = self.clock()
+            if breaker.state == OPEN:
+                retry_in = breaker.opened_at + breaker.open_for - now
+                if retry_in > 0:
+                    breaker.rejected += 1
+                    raise CircuitOpenError(domain, retry_in)
+                breaker.state = HALF_OPEN
+                breaker.probes_in_flight = 0
+                breaker.probe_successes = 0
+                logger.info("Circuit breaker for %s HALF_OPEN; probing", domain)
+            if breaker.state == HALF_OPEN:
+                if breaker.probes_in_flight >= self.half_open_max_calls:
+                    breaker.rejected += 1
+                    raise CircuitOpenError(domain, 0.0)
+                breaker.probes_in_flight += 1
+
+    def record_success(self, domain: str) -> None:
+        with self._lock:
+            breaker = self._breaker(domain)
+            if breaker.state == HALF_OPEN:
+                breaker.probes_in_flight = max(0, breaker.probes_in_flight - 1)
+                breaker.probe_successes += 1
+                if breaker.probe_successes >= self.success_threshold:
+                    breaker.state = CLOSED
+                    breaker.calls.clear()
+                    breaker.open_for = 0.0
+                    logger.info("Circuit breaker for %s CLOSED", domain)
+                return
+            self._add_call(breaker, True)
+
+    def record_failure(self, domain: str) -> None:
+        with self._lock:
+            breaker = self._breaker(domain)
+            if breaker.state == HALF_OPEN:
+                breaker.probes_in_flight = max(0, breaker.probes_in_flight - 1)
+                self._trip(breaker)
+                return
+            if breaker.state == OPEN:
+                return  # a call admitted before the breaker opened
+            self._add_call(breaker, False)
+            failures = sum(1 for _, ok in breaker.calls if not ok)
+            if len(breaker.calls) >= self.min_calls and failures >= self.failure_rate * len(breaker.calls):
+                self._trip(breaker)
+
+    def retry_in(self, domain: str) -> float:
+        """Seconds until ``domain`` accepts requests again (0.0 unless open), without
+        admitting a call; use it to defer queued URLs instead of failing them.
+        """
+        with self._lock:
+            breaker = self.breakers.get(domain)
+            if breaker is None or breaker.state != OPEN:
+                return 0.0
+            return max(0.0, breaker.opened_at + breaker.open_for - self.clock())
+
+    def state(self, domain: str) -> str:
+        with self._lock:
+            breaker = self.breakers.get(domain)
+            return breaker.state if breaker is not None else CLOSED
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Breakers that are not closed or have rejected calls."""
+        now = self.clock()
+        with self._lock:
+            return {
+                domain: {
+                    "state": b.state,
+                    "trips": b.trips,
+                    "rejected": b.rejected,
+                    "retry_in_s": round(max(0.0, b.opened_at + b.open_for - now), 1) if b.state == OPEN else 0.0,
+                }
+                for domain, b in self.breakers.items()
+                if b.state != CLOSED or b.rejected
+            }
+
+    # ------------------------- Internal -------------------------
+    def _breaker(self, domain: str) -> DomainBreaker:
+        """Caller holds the lock."""
+        breaker = self.breakers.get(domain)
+        if breaker is None:
+            breaker = self.breakers[domain] = DomainBreaker(domain)
+        return breaker
+
+    def _add_call(self, breaker: DomainBreaker, ok: bool) -> None:
+        now = self.clock()
+        calls = breaker.calls
+        calls.append((now, ok))
+        while calls and (len(calls) > self.window_calls or calls[0][0] < now - self.window):
+            calls.popleft()
+
+    def _trip(self, breaker: DomainBreaker) -> None:
+        reopened = breaker.state == HALF_OPEN
+        breaker.state = OPEN
+        breaker.opened_at = self.clock()
+        breaker.open_for = min(self.max_open_for, breaker.open_for * 2 if reopened else self.open_for)
+        breaker.trips += 1
+        breaker.calls.clear()
+        logger.warning(
+            "Circuit breaker for %s OPEN for %.0fs (%d trips)", breaker.domain, breaker.open_for, breaker.trips
+        )
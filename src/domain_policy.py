@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+"""
+Domain Policy Index - label-aware suffix matching for Harvest.ai's domain lists
+Blacklist, whitelist and known-API lookups cost O(number of labels in the host),
+independent of list size, and only match on whole labels ("notmedium.com" is not
+"medium.com", "blog.medium.com" is).
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+
+def normalize_host(host: str) -> str:
+    """Lowercase a host/netloc and drop userinfo, port and trailing dot."""
+    host = host.rpartition("@")[2].lower()
+    if host.startswith("["):  # IPv6 literal
+        return host.split("]", 1)[0] + "]"
+    return host.split(":", 1)[0].rstrip(".")
+
+
+class DomainSuffixIndex(MutableMapping):
+    """Hashed-suffix index mapping registered domains to a policy value.
+
+    ``domain in index`` is exact membership (like the sets it replaces);
+    ``match(host)`` returns the most specific registered suffix of ``host``.
+    """
+
+    def __init__(self, domains: Union[Mapping[str, Any], Iterable[str], None] = None) -> None:
+        self._entries: Dict[str, Any] = {}
+        if isinstance(domains, Mapping):
+            for domain, value in domains.items():
+                self[domain] = value
+        elif domains is not None:
+            self.add_all(domains)
+
+    @classmethod
+    def from_file(cls, path: str) -> "DomainSuffixIndex":
+        """Load one domain per line; blank lines and ``#`` comments are ignored."""
+        index = cls()
+        with open(path, "r", encoding="utf-8") as fh:
+            index.add_all(line.split("#", 1)[0].strip() for line in fh)
+        return index
+
+    # ------------------------- Set-style API -------------------------
+    def add(self, domain: str, value: Any = True) -> None:
+        self[domain] = value
+
+    def add_all(self, domains: Iterable[str], value: Any = True) -> None:
+        entries = self._entries
+        for domain in domains:
+            if domain:
+                entries[normalize_host(domain)] = value
+
+    def discard(self, domain: str) -> None:
+        self._entries.pop(normalize_host(domain), None)
+
+    # ------------------------- Lookups -------------------------
+    def match(self, host: str) -> Optional[Tuple[str, Any]]:
+        """Return (registered_suffix, value) for the most specific match, or None."""
+        entries = self._entries
+        if not entries:
+            return None
+        host = normalize_host(host)
+        start = 0
+        while True:
+            suffix = host[start:] if start else host
+            if suffix in entries:
+                return suffix, entries[suffix]
+            dot = host.find(".", start)
+            if dot < 0:
+                return None
+            start = dot + 1
+
+    def matches(self, host: str) -> bool:
+        return self.match(host) is not None
+
+    def lookup(self, host: str, default: Any = None) -> Any:
+        found = self.match(host)
+        return found[1] if found is not None else default
+
+    # ------------------------- Mapping protocol -------------------------
+    def __getitem__(self, domain: str) -> Any:
+        return self._entries[normalize_host(domain)]
+
+    def __setitem__(self, domain: str, value: Any) -> None:
+        self._entries[normalize_host(domain)] = value
+
+    def __delitem__(self, domain: str) -> None:
+        del self._entries[normalize_host(domain)]
+
+    def __contains__(self, domain: object) -> bool:
+        return isinstance(domain, str) and normalize_host(domain) in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self._entries)} domains)"
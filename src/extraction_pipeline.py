@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+"""
+Extraction Pipeline - asyncio downloads feeding a process pool for CPU-bound parsing
+Fetches run concurrently on one event loop and put raw bytes on a bounded queue;
+a ProcessPoolExecutor decodes, parses and extracts features outside the GIL and
+sends back compact records. fetch_concurrency and cpu_workers set the IO/CPU
+split, and the queue bound stops fast downloads from piling up in memory.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# url -> (raw body, declared charset), e.g. AsyncLegalComplianceEngine.fetch_bytes
+FetchFn = Callable[[str], Awaitable[Tuple[bytes, Optional[str]]]]
+# (raw body, charset) -> record; runs in a worker process, so it must be picklable
+ExtractFn = Callable[[bytes, Optional[str]], Any]
+
+
+@dataclass
+class PipelineResult:
+    url: str
+    record: Any = None
+    error: Optional[str] = None
+
+
+class ExtractionPipeline:
+    """Bounded producer/consumer pipeline: async fetchers -> queue -> process pool."""
+
+    def __init__(
+        self,
+        fetch: FetchFn,
+        extract: ExtractFn,
+        fetch_concurrency: int = 16,
+        cpu_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.fetch = fetch
+        self.extract = extract
+        self.fetch_concurrency = fetch_concurrency
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+        # Pages downloaded but not yet handed to a worker
+        self.queue_size = queue_size or self.cpu_workers * 4
+        # A caller-owned executor is reused across runs and left running
+        self._executor = executor
+        self.stats: Dict[str, float] = {}
+
+    # ------------------------- Public API -------------------------
+    async def run(self, urls: Iterable[str]) -> List[PipelineResult]:
+        """Fetch and extract every URL; results come back in input order."""
+        results = [PipelineResult(url) for url in urls]
+        self.stats = {
+            "fetched": 0, "fetch_failed": 0, "extracted": 0, "extract_failed": 0, "queue_peak": 0,
+        }
+        queue: "asyncio.Queue[Optional[Tuple[int, bytes, Optional[str]]]]" = asyncio.Queue(self.queue_size)
+        todo = iter(enumerate(results))
+        loop = asyncio.get_running_loop()
+        executor = self._executor or ProcessPoolExecutor(self.cpu_workers)
+        started = time.perf_counter()
+
+        async def fetcher() -> None:
+            for index, result in todo:
+                try:
+                    body, encoding = await self.fetch(result.url)
+                except Exception as exc:
+                    result.error = f"fetch failed: {exc}"
+                    self.stats["fetch_failed"] += 1
+                    continue
+                self.stats["fetched"] += 1
+                await queue.put((index, body, encoding))
+                self.stats["queue_peak"] = max(self.stats["queue_peak"], queue.qsize())
+
+        async def extractor() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, body, encoding = item
+                try:
+                    results[index].record = await loop.run_in_executor(executor, self.extract, body, encoding)
+                    self.stats["extracted"] += 1
+                except Exception as exc:
+                    results[index].error = f"extract failed: {exc}"
+                    self.stats["extract_failed"] += 1
+
+        fetchers = [asyncio.ensure_future(fetcher()) for _ in range(self.fetch_concurrency)]
+        # Two jobs in flight per worker keep processes busy while results are pickled back
+        extractors = [asyncio.ensure_future(extractor()) for _ in range(self.cpu_workers * 2)]
+        try:
+            await asyncio.gather(*fetchers)
+            for _ in extractors:
+                await queue.put(None)
+            await asyncio.gather(*extractors)
+        finally:
+            for task in fetchers + extractors:
+                task.cancel()
+            if self._executor is None:
+                executor.shutdown(wait=True)
+
+        elapsed = time.perf_counter() - started
+        self.stats["elapsed_s"] = round(elapsed, 3)
+        self.stats["pages_per_sec"] = round(self.stats["extracted"] / elapsed, 1) if elapsed else 0.0
+        return results
+
+    def run_sync(self, urls: Iterable[str]) -> List[PipelineResult]:
+        return asyncio.run(self.run(urls))
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+"""
+Fetch Metrics - per-phase latency histograms and counters for Harvest.ai's fetch path
+Phases: robots_fetch, politeness_wait, connect (DNS + TCP/TLS), download, parse, text.
+Each observation is labeled by domain and outcome (HTTP status, block reason,
+error kind), costs one lock and a bisect, and is readable through snapshot()
+(pull API) or to_prometheus() (text exposition format).
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Seconds; spans sub-millisecond parses up to multi-second politeness waits
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+PHASES = ("robots_fetch", "politeness_wait", "connect", "download", "parse", "text")
+
+OTHER_DOMAIN = "_other"
+
+
+class FetchMetrics:
+    """Thread-safe histograms (per phase/domain/outcome) and event counters."""
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_domains: int = 500,
+        enabled: bool = True,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # Domain labels beyond this many are folded into "_other" to bound cardinality
+        self.max_domains = max_domains
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # (phase, domain, outcome) -> [bucket counts..., +Inf count, sum]
+        self._histograms: Dict[Tuple[str, str, str], List[float]] = {}
+        # (event, domain, outcome) -> total
+        self._counters: Dict[Tuple[str, str, str], float] = {}
+        self._domains: set = set()
+
+    # ------------------------- Recording -------------------------
+    def observe(self, phase: str, seconds: float, domain: str = "", outcome: str = "ok") -> None:
+        if not self.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            key = (phase, self._domain_label(domain), outcome)
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0.0] * (len(self.buckets) + 2)
+            hist[index] += 1
+            hist[-1] += seconds
+
+    def count(self, event: str, domain: str = "", outcome: str = "ok", value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (event, self._domain_label(domain), outcome)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._domains.clear()
+
+    # ------------------------- Pull API -------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-phase totals and latency estimates, plus raw per-label series."""
+        with self._lock:
+            histograms = {key: list(hist) for key, hist in self._histograms.items()}
+            counters = dict(self._counters)
+        phases: Dict[str, List[float]] = {}
+        for (phase, _, _), hist in histograms.items():
+            merged = phases.setdefault(phase, [0.0] * len(hist))
+            for i, value in enumerate(hist):
+                merged[i] += value
+        return {
+            "phases": {phase: self._summarize(hist) for phase, hist in phases.items()},
+            "series": [
+                {"phase": phase, "domain": domain, "outcome": outcome, **self._summarize(hist)}
+                for (phase, domain, outcome), hist in sorted(histograms.items())
+            ],
+            "counters": [
+                {"event": event, "domain": domain, "outcome": outcome, "value": value}
+                for (event, domain, outcome), value in sorted(counters.items())
+            ],
+        }
+
+    def phase_totals(self) -> Dict[str, float]:
+        """Seconds spent per phase: shows whether a crawl is politeness-, network- or CPU-bound."""
+        return {phase: summary["sum_s"] for phase, summary in self.snapshot()["phases"].items()}
+
+    def to_prometheus(self, prefix: str = "harvest") -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = sorted((key, list(hist)) for key, hist in self._histograms.items())
+            counters = sorted(self._counters.items())
+        name = f"{prefix}_fetch_phase_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each phase of the compliance fetch path.",
+            f"# TYPE {name} histogram",
+        ]
+        for (phase, domain, outcome), hist in histograms:
+            labels = f'phase="{_escape(phase)}",domain="{_escape(domain)}",outcome="{_escape(outcome)}"'
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, hist):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {int(cumulative)}')
+            total = int(sum(hist[:-1]))
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {total}')
+            lines.append(f"{name}_sum{{{labels}}} {hist[-1]:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {total}")
+        name = f"{prefix}_fetch_events_total"
+        lines += [
+            f"# HELP {name} Compliance decisions and fetch events by domain and outcome.",
+            f"# TYPE {name} counter",
+        ]
+        for (event, domain, outcome), value in counters:
+            if event == "bytes":
+                continue
+            labels = f'event="{_escape(event)}",domain="{_escape(domain)}",outcome="{_escape(outcome)}"'
+            lines.append(f"{name}{{{labels}}} {value:g}")
+        name = f"{prefix}_fetch_bytes_total"
+        lines += [
+            f"# HELP {name} Response body bytes downloaded by domain and outcome.",
+            f"# TYPE {name} counter",
+        ]
+        for (event, domain, outcome), value in counters:
+            if event == "bytes":
+                labels = f'domain="{_escape(domain)}",outcome="{_escape(outcome)}"'
+                lines.append(f"{name}{{{labels}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    # ------------------------- Internal -------------------------
+    def _domain_label(self, domain: str) -> str:
+        """Caller holds the lock."""
+        if domain in self._domains:
+            return domain
+        if len(self._domains) < self.max_domains:
+            self._domains.add(domain)
+            return domain
+        return OTHER_DOMAIN
+
+    def _summarize(self, hist: List[float]) -> Dict[str, float]:
+        count = sum(hist[:-1])
+        total = hist[-1]
+        return {
+            "count": int(count),
+            "sum_s": round(total, 6),
+            "mean_s": round(total / count, 6) if count else 0.0,
+            "p50_s": self._quantile(hist, 0.5),
+            "p95_s": self._quantile(hist, 0.95),
+        }
+
+    def _quantile(self, hist: List[float], q: float) -> float:
+        """Estimate from bucket counts, interpolating linearly within the bucket."""
+        count = sum(hist[:-1])
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0.0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, hist):
+            if bucket_count and seen + bucket_count >= rank:
+                return round(lower + (bound - lower) * (rank - seen) / bucket_count, 6)
+            seen += bucket_count
+            lower = bound
+        return self.buckets[-1]  # in the +Inf bucket
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
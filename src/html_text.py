@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+"""
+HTML Text Extraction - parser backends and HTML-to-text conversion for Harvest.ai
+Backends: "html.parser" (stdlib, default), "lxml" and "selectolax" (lexbor) when
+installed. HTMLTextExtractor is fed chunk by chunk while a response streams in,
+so memory stays bounded by the extracted text rather than the raw page.
+"""
+
+import functools
+import importlib.util
+import re
+import time
+from html import unescape
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+# Same tags LegalComplianceEngine strips before extracting text; <template> content
+# is inert (lxml and lexbor keep it out of the document), so every backend skips it
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "template"})
+
+# Escapable raw text elements: their content is text (entities decoded, tags not
+# parsed). lxml and lexbor do this; the stdlib parser needs telling
+RCDATA_TAGS = frozenset({"textarea", "title"})
+
+# lexbor parses as a browser with scripting off would (a leading <noscript>'s
+# children move into <body>) and keeps CDATA inside <svg>/<math> as text; the
+# other backends skip both, so they are cut from the markup before lexbor sees it
+_SELECTOLAX_SKIPPED = re.compile(r"<noscript\b.*?</noscript\s*>|<!\[CDATA\[.*?\]\]>", re.I | re.S)
+_SELECTOLAX_SKIPPED_BYTES = re.compile(_SELECTOLAX_SKIPPED.pattern.encode("ascii"), re.I | re.S)
+
+HTML_CONTENT_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+
+# Fastest first; "auto" picks the first installed one
+PARSER_BACKENDS = ("selectolax", "lxml", "html.parser")
+DEFAULT_PARSER_BACKEND = "html.parser"
+
+
+def available_backends() -> List[str]:
+    """Parser backends whose dependencies are installed."""
+    modules = {"selectolax": "selectolax", "lxml": "lxml", "html.parser": "html.parser"}
+    return [name for name in PARSER_BACKENDS if importlib.util.find_spec(modules[name]) is not None]
+
+
+def resolve_backend(backend: Optional[str]) -> str:
+    """Validate a backend name; None means the default, "auto" the fastest installed."""
+    if backend is None:
+        return DEFAULT_PARSER_BACKEND
+    if backend == "auto":
+        return available_backends()[0]
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}; expected one of {PARSER_BACKENDS} or 'auto'")
+    if backend not in available_backends():
+        raise ImportError(f"Parser backend {backend!r} is not installed")
+    return backend
+
+
+def parse_html(html: Any, backend: Optional[str] = None) -> Any:
+    """Parse into a BeautifulSoup tree for structural analysis.
+    selectolax has no BeautifulSoup tree builder, so it parses with lxml when
+    installed (html.parser otherwise); it only speeds up text extraction.
+    """
+    from bs4 import BeautifulSoup
+
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        backend = "lxml" if "lxml" in available_backends() else "html.parser"
+    if backend == "html.parser":
+        return BeautifulSoup(html, builder=_rcdata_tree_builder_class()())
+    return BeautifulSoup(html, backend)
+
+
+def soup_text(soup: Any) -> str:
+    """Same text as extract_text(), but leaves a shared tree untouched."""
+    from bs4 import NavigableString
+
+    parts = []
+    for string in soup.find_all(string=True):
+        if type(string) is not NavigableString:
+            continue  # comments, doctypes, CDATA sections (bogus comments in HTML)
+        parent = string.parent
+        while parent is not None and parent.name not in SKIPPED_TAGS:
+            parent = parent.parent
+        if parent is None:
+            parts.append(string)
+    return " ".join(" ".join(parts).split())
+
+
+def extract_text(html: Any, backend: Optional[str] = None, timings: Optional[Dict[str, float]] = None) -> str:
+    """Strip scripts/styles and collapse whitespace into plain text.
+    If ``timings`` is given, seconds spent parsing and extracting text are stored
+    under "parse" and "text".
+    """
+    backend = resolve_backend(backend)
+    started = time.perf_counter()
+    if backend == "selectolax":
+        return _selectolax_text(html, timings, started)
+    from bs4 import NavigableString
+
+    soup = parse_html(html, backend)
+    parsed = time.perf_counter()
+    # The tree is private here, so stripping in place is cheaper than soup_text()
+    for tag in soup(list(SKIPPED_TAGS)):
+        tag.extract()
+    # Plain strings only: html.parser keeps <![CDATA[...]]> as a CData node, which
+    # HTML treats as a comment (lxml and lexbor drop it)
+    text = " ".join(soup.get_text(" ", types=(NavigableString,)).split())
+    if timings is not None:
+        timings["parse"] = parsed - started
+        timings["text"] = time.perf_counter() - parsed
+    return text
+
+
+def _selectolax_text(html: Any, timings: Optional[Dict[str, float]], started: float) -> str:
+    try:
+        from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    except ImportError:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+
+    skipped = _SELECTOLAX_SKIPPED_BYTES if isinstance(html, bytes) else _SELECTOLAX_SKIPPED
+    tree = SelectolaxParser(skipped.sub(" " if isinstance(html, str) else b" ", html))
+    if timings is not None:
+        timings["parse"] = time.perf_counter() - started
+    tree.strip_tags(list(SKIPPED_TAGS))
+    root = tree.root
+    text = " ".join((root.text(separator=" ") if root is not None else "").split())
+    if timings is not None:
+        timings["text"] = time.perf_counter() - started - timings["parse"]
+    return text
+
+
+@functools.lru_cache(maxsize=None)
+def _rcdata_tree_builder_class() -> type:
+    """bs4's html.parser tree builder, with <textarea>/<title> parsed as RCDATA
+    like the other backends do. Built on first use so bs4 is imported lazily.
+    """
+    from bs4.builder import ParserRejectedMarkup
+    from bs4.builder._htmlparser import BeautifulSoupHTMLParser, HTMLParserTreeBuilder
+
+    class RcdataSoupParser(BeautifulSoupHTMLParser):
+        CDATA_CONTENT_ELEMENTS = BeautifulSoupHTMLParser.CDATA_CONTENT_ELEMENTS + tuple(RCDATA_TAGS)
+
+        def handle_data(self, data: str) -> None:
+            if self.cdata_elem in RCDATA_TAGS:
+                data = unescape(data)  # raw text mode leaves charrefs alone
+            super().handle_data(data)
+
+    class RcdataTreeBuilder(HTMLParserTreeBuilder):
+        def feed(self, markup: Any) -> None:
+            args, kwargs = self.parser_args
+            parser = RcdataSoupParser(self.soup, *args, **kwargs)
+            try:
+                parser.feed(markup)
+                parser.close()
+                if parser.cdata_elem in RCDATA_TAGS and parser.rawdata:
+                    parser.handle_data(parser.rawdata)  # unclosed, e.g. a truncated page
+            except AssertionError as exc:
+                raise ParserRejectedMarkup(exc)
+            parser.already_closed_empty_element = []
+
+    return RcdataTreeBuilder
+
+
+def is_html_content_type(content_type: str) -> bool:
+    """True for HTML media types; a missing Content-Type is treated as HTML."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return not media_type or media_type in HTML_CONTENT_TYPES
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Streaming counterpart of ``html_to_text``: feed() chunks, then close()."""
+
+    CDATA_CONTENT_ELEMENTS = HTMLParser.CDATA_CONTENT_ELEMENTS + tuple(RCDATA_TAGS)
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        # Raw content of the open <textarea>/<title>, decoded once it closes (a
+        # charref may be split across feed() chunks)
+        self._rcdata: List[str] = []
+        self._parts: List[str] = []
+        self._chunks: List[str] = []
+        self._text = ""
+        # A text node can arrive in several handle_data calls when a feed() chunk
+        # ends inside it; only a markup boundary separates words
+        self._at_boundary = True
+
+    def handle_starttag(self, tag: str, attrs: object) -> None:
+        self._boundary()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush_rcdata()
+        self._boundary()
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_startendtag(self, tag: str, attrs: object) -> None:
+        self._boundary()
+
+    def handle_comment(self, data: str) -> None:
+        self._boundary()
+
+    def unknown_decl(self, data: str) -> None:
+        self._boundary()  # <![CDATA[...]]> outside SVG/MathML is a comment in HTML
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        if self.cdata_elem in RCDATA_TAGS:
+            self._rcdata.append(data)
+            return
+        if self._at_boundary or not self._parts:
+            self._parts.append(data)
+            self._at_boundary = False
+        else:
+            self._parts[-1] += data
+
+    def close(self) -> str:  # type: ignore[override]
+        """Flush the parser and return whitespace-normalized text."""
+        super().close()
+        if self.cdata_elem in RCDATA_TAGS and self.rawdata:
+            self._rcdata.append(self.rawdata)  # unclosed, e.g. a truncated page
+            self.rawdata = ""
+        self._flush_rcdata()
+        self._flush_parts()
+        self._text = " ".join(self._chunks)
+        self._chunks = []
+        return self._text
+
+    def _boundary(self) -> None:
+        self._at_boundary = True
+        if len(self._parts) >= 1024:
+            self._flush_parts()
+
+    def _flush_rcdata(self) -> None:
+        if self._rcdata:
+            self._boundary()
+            self._parts.append(unescape("".join(self._rcdata)))
+            self._rcdata = []
+            self._boundary()
+
+    def _flush_parts(self) -> None:
+        # Normalize whitespace as we go so many small text nodes don't pile up
+        chunk = " ".join(" ".join(self._parts).split())
+        if chunk:
+            self._chunks.append(chunk)
+        self._parts = []
+
+    @property
+    def text(self) -> str:
+        return self._text
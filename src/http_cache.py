@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+"""
+HTTP Response Cache - content-addressed on-disk cache for Harvest.ai's fetch path
+Bodies are stored compressed by content hash, so identical pages are kept once.
+Entries are keyed by normalized URL, revalidated with If-None-Match /
+If-Modified-Since, evicted LRU past max_bytes, and concurrent requests for the
+same URL (threads or processes) share a single network fetch.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from url_frontier import normalize_url
+
+
+logger = logging.getLogger(__name__)
+
+
+# Describe the wire encoding, not the decoded body the cache stores and replays
+_WIRE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+def cache_key(url: str) -> str:
+    """Cache lookup key: the crawl frontier's canonical URL (see url_frontier.normalize_url)."""
+    return normalize_url(url)
+
+
+@dataclass
+class CacheEntry:
+    url_key: str
+    body_hash: str
+    status: int
+    headers: Dict[str, str]
+    fetched_at: float
+
+
+def _replayable_headers(headers: Mapping[str, str]) -> Dict[str, str]:
+    return {k: v for k, v in headers.items() if k.lower() not in _WIRE_HEADERS}
+
+
+class CachedResponse:
+    """requests.Response look-alike served from the cache."""
+
+    def __init__(self, url: str, entry: CacheEntry, body: bytes, from_cache: bool = True) -> None:
+        self.url = url
+        self.status_code = entry.status
+        self.headers = CaseInsensitiveDict(_replayable_headers(entry.headers))
+        self.content = body
+        self.from_cache = from_cache
+        self.encoding = get_encoding_from_headers(self.headers) or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def iter_content(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)  # type: ignore[arg-type]
+
+    def close(self) -> None:
+        pass
+
+
+class ResponseCache:
+    """Content-addressed response store with conditional revalidation and LRU eviction."""
+
+    def __init__(
+        self,
+        directory: str = "./cache/http",
+        max_bytes: int = 512 * 1024 * 1024,
+        fresh_for: float = 0.0,
+        compress_level: int = 6,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Entries younger than fresh_for seconds are served without revalidation
+        self.fresh_for = fresh_for
+        self.compress_level = compress_level
+        self.stats: Dict[str, int] = {
+            "hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "deduplicated": 0, "evicted": 0,
+        }
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._key_locks: Dict[str, list] = {}
+        self._key_locks_guard = threading.Lock()
+        # Kept open for the cache's lifetime: closing any descriptor of a file
+        # drops every POSIX record lock this process holds on it
+        self._lock_file = open(os.path.join(directory, "fetch.lock"), "a")
+        self._db = sqlite3.connect(
+            os.path.join(directory, "index.sqlite3"), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url_key TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access);
+            CREATE INDEX IF NOT EXISTS entries_body_hash ON entries(body_hash);
+            CREATE TABLE IF NOT EXISTS bodies (
+                body_hash TEXT PRIMARY KEY,
+                stored_bytes INTEGER NOT NULL
+            );
+            """
+        )
+
+    # ------------------------- Public API -------------------------
+    def fetch(self, url: str, send: Callable[[Mapping[str, str]], Any]) -> Any:
+        """Return a cached or fresh response for url.
+        ``send(headers)`` performs the network GET with the given conditional headers.
+        Only one caller per URL talks to the network at a time; callers that
+        waited for it are served the result it stored.
+        """
+        key = cache_key(url)
+        waiting_since = time.time()
+        with self._single_flight(key):
+            entry = self._lookup(key)
+            if entry is not None and (
+                entry.fetched_at >= waiting_since or time.time() - entry.fetched_at < self.fresh_for
+            ):
+                body = self._read_body(entry.body_hash)
+                if body is not None:
+                    self.stats["hits"] += 1
+                    self._touch(key)
+                    return CachedResponse(url, entry, body)
+
+            resp = send(self._conditional_headers(entry))
+            if resp.status_code == 304 and entry is not None:
+                body = self._read_body(entry.body_hash)
+                if body is not None:
+                    self.stats["revalidated"] += 1
+                    entry.fetched_at = time.time()
+                    self._write_entry(entry)
+                    return CachedResponse(url, entry, body)
+                resp = send({})  # body went missing on disk; refetch unconditionally
+
+            self.stats["misses"] += 1
+            if resp.status_code == 200:
+                self._store(key, resp)
+            return resp
+
+    def invalidate(self, url: str) -> None:
+        with self._db_lock:
+            self._db.execute("DELETE FROM entries WHERE url_key = ?", (cache_key(url),))
+        self._collect_garbage()
+
+    def size_bytes(self) -> int:
+        with self._db_lock:
+            row = self._db.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM bodies").fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._db.close()
+        self._lock_file.close()
+
+    # ------------------------- Internal -------------------------
+    @contextmanager
+    def _single_flight(self, key: str) -> Iterator[None]:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        with self._key_locks_guard:
+            slot = self._key_locks.setdefault(digest, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                # A byte-range lock keyed by the URL extends single-flight to other
+                # worker processes without serializing unrelated URLs
+                offset = int(digest[:12], 16)
+                fcntl.lockf(self._lock_file, fcntl.LOCK_EX, 1, offset)
+                try:
+                    yield
+                finally:
+                    fcntl.lockf(self._lock_file, fcntl.LOCK_UN, 1, offset)
+        finally:
+            with self._key_locks_guard:
+                slot[1] -= 1
+                if not slot[1]:
+                    self._key_locks.pop(digest, None)
+
+    @staticmethod
+    def _conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            lowered = {k.lower(): v for k, v in entry.headers.items()}
+            if "etag" in lowered:
+                headers["If-None-Match"] = lowered["etag"]
+            if "last-modified" in lowered:
+                headers["If-Modified-Since"] = lowered["last-modified"]
+        return headers
+
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT body_hash, status, headers, fetched_at FROM entries WHERE url_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(url_key=key, body_hash=row[0], status=row[1], headers=json.loads(row[2]), fetched_at=row[3])
+
+    def _touch(self, key: str) -> None:
+        with self._db_lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url_key = ?", (time.time(), key))
+
+    def _write_entry(self, entry: CacheEntry) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (entry.url_key, entry.body_hash, entry.status, json.dumps(entry.headers), entry.fetched_at, time.time()),
+            )
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.directory, "bodies", body_hash[:2], f"{body_hash}.z")
+
+    def _read_body(self, body_hash: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(body_hash), "rb") as fh:
+                return zlib.decompress(fh.read())
+        except (OSError, zlib.error) as exc:
+            logger.warning("Cached body %s unreadable: %s", body_hash, exc)
+            return None
+
+    def _store(self, key: str, resp: Any) -> None:
+        body = resp.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._body_path(body_hash)
+        with self._db_lock:
+            known = self._db.execute("SELECT 1 FROM bodies WHERE body_hash = ?", (body_hash,)).fetchone()
+        if known and os.path.exists(path):
+            self.stats["deduplicated"] += 1
+        else:
+            compressed = zlib.compress(body, self.compress_level)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(compressed)
+            os.replace(tmp, path)
+            with self._db_lock:
+                self._db.execute("INSERT OR REPLACE INTO bodies VALUES (?, ?)", (body_hash, len(compressed)))
+        self.stats["stored"] += 1
+        headers = _replayable_headers(resp.headers)
+        self._write_entry(CacheEntry(key, body_hash, resp.status_code, headers, time.time()))
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the bodies fit in max_bytes."""
+        while self.size_bytes() > self.max_bytes:
+            with self._db_lock:
+                row = self._db.execute("SELECT url_key FROM entries ORDER BY last_access LIMIT 1").fetchone()
+                if row is None:
+                    break
+                self._db.execute("DELETE FROM entries WHERE url_key = ?", (row[0],))
+            self.stats["evicted"] += 1
+            self._collect_garbage()
+
+    def _collect_garbage(self) -> None:
+        """Delete bodies no entry references any more."""
+        with self._db_lock:
+            orphans = self._db.execute(
+                "SELECT body_hash FROM bodies WHERE body_hash NOT IN (SELECT body_hash FROM entries)"
+            ).fetchall()
+            self._db.executemany("DELETE FROM bodies WHERE body_hash = ?", orphans)
+        for (body_hash,) in orphans:
+            try:
+                os.remove(self._body_path(body_hash))
+            except FileNotFoundError:
+                pass
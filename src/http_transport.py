@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+"""
+HTTP Transport - one shared, tuned connection pool for Harvest.ai's fetch path
+Robots.txt, topic pages and article fetches all go through an HttpTransport so
+keep-alive connections are reused across them; requests/urllib3 are only
+imported when the first session is created. Connection-reuse counters are
+exposed via stats(), and per-host circuit breakers fail requests to dead hosts
+fast. HTTP/2 multiplexing is used when httpx[http2] is installed
+and requested, and an optional ResponseCache serves repeat fetches from disk.
+"""
+
+import functools
+import importlib.util
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Mapping, Optional
+from urllib.parse import urlsplit
+
+from circuit_breaker import CircuitBreakerRegistry
+
+if TYPE_CHECKING:
+    import requests
+
+    from fetch_metrics import FetchMetrics
+    from http_cache import ResponseCache
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Harvest.ai/1.0 (https://harvest.ai; legal@harvest.ai) Educational Content Bot"
+
+
+class TransportStats:
+    """Thread-safe request / new-connection counters per host.
+    Hosts are URL netlocs ("example.com", "example.com:8443"), the same key the
+    compliance engine labels every other fetch phase with.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # netloc of the request being sent on this thread; urllib3 opens its
+        # connections in the caller's thread, so connect() can label by it
+        self._sending = threading.local()
+        # Optional FetchMetrics receiving "connect" (DNS + TCP/TLS) timings
+        self.metrics: Optional["FetchMetrics"] = None
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.connections: Dict[str, int] = defaultdict(int)
+        self.http_versions: Dict[str, int] = defaultdict(int)
+
+    def request_sent(self, host: str) -> None:
+        self._sending.host = host
+        with self._lock:
+            self.requests[host] += 1
+
+    def sending_host(self, default: str) -> str:
+        return getattr(self._sending, "host", None) or default
+
+    def connection_opened(self, host: str) -> None:
+        with self._lock:
+            self.connections[host] += 1
+
+    def connect_finished(self, host: str, seconds: float, outcome: str) -> None:
+        if self.metrics is not None:
+            self.metrics.observe("connect", seconds, host, outcome)
+
+    def response_received(self, http_version: str) -> None:
+        with self._lock:
+            self.http_versions[http_version] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total_requests = sum(self.requests.values())
+            total_connections = sum(self.connections.values())
+            return {
+                "requests": total_requests,
+                "connections_opened": total_connections,
+                "connections_reused": max(0, total_requests - total_connections),
+                "reuse_ratio": (
+                    round(1 - total_connections / total_requests, 3) if total_requests else 0.0
+                ),
+                "http_versions": dict(self.http_versions),
+                "per_host": {
+                    host: {"requests": count, "connections_opened": self.connections.get(host, 0)}
+                    for host, count in self.requests.items()
+                },
+            }
+
+
+@functools.lru_cache(maxsize=None)
+def _counting_adapter_class() -> type:
+    """HTTPAdapter whose urllib3 pools report every new connection.
+    Built on first use so importing this module does not import requests/urllib3.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class CountingHTTPAdapter(HTTPAdapter):
+        def __init__(self, stats: TransportStats, **kwargs: Any) -> None:
+            self._stats = stats
+            super().__init__(**kwargs)
+
+        def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+            super().init_poolmanager(*args, **kwargs)
+            stats = self._stats
+
+            # connect() also runs when urllib3 silently re-opens a dropped keep-alive socket
+            def timed_connect(conn: HTTPConnection, connect: Any) -> None:
+                host = stats.sending_host(conn.host)
+                stats.connection_opened(host)
+                started = time.perf_counter()
+                try:
+                    connect()
+                except Exception as exc:
+                    stats.connect_finished(host, time.perf_counter() - started, type(exc).__name__)
+                    raise
+                stats.connect_finished(host, time.perf_counter() - started, "ok")
+
+            class CountingHTTPConnection(HTTPConnection):
+                def connect(self) -> None:
+                    timed_connect(self, super().connect)
+
+            class CountingHTTPSConnection(HTTPSConnection):
+                def connect(self) -> None:
+                    timed_connect(self, super().connect)
+
+            class CountingHTTPConnectionPool(HTTPConnectionPool):
+                ConnectionCls = CountingHTTPConnection
+
+            class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+                ConnectionCls = CountingHTTPSConnection
+
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": CountingHTTPConnectionPool,
+                "https": CountingHTTPSConnectionPool,
+            }
+
+    return CountingHTTPAdapter
+
+
+class _HttpxResponse:
+    """Presents an httpx.Response with the requests.Response surface we use."""
+
+    def __init__(self, response: Any) -> None:
+        self._response = response
+        self.status_code: int = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+
+    @property
+    def content(self) -> bytes:
+        return self._response.read()
+
+    @property
+    def text(self) -> str:
+        self._response.read()
+        return self._response.text
+
+    @property
+    def encoding(self) -> Optional[str]:
+        return self._response.charset_encoding
+
+    def iter_content(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        return self._response.iter_bytes(chunk_size)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            import requests
+
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)  # type: ignore[arg-type]
+
+    def close(self) -> None:
+        self._response.close()
+
+
+class HttpTransport:
+    """Shared HTTP client: per-host pool limits, keep-alive, optional HTTP/2."""
+
+    def __init__(
+        self,
+        user_agent: str = DEFAULT_USER_AGENT,
+        max_hosts: int = 64,
+        max_connections_per_host: int = 8,
+        max_retries: int = 0,
+        http2: bool = False,
+        cache: Optional["ResponseCache"] = None,
+        metrics: Optional["FetchMetrics"] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+    ) -> None:
+        self.user_agent = user_agent
+        self.max_hosts = max_hosts
+        self.max_connections_per_host = max_connections_per_host
+        self.max_retries = max_retries
+        # Optional content-addressed response cache (see http_cache.ResponseCache)
+        self.cache = cache
+        # Per-host circuit breakers: requests to a failing host raise CircuitOpenError
+        # immediately instead of waiting out their timeouts
+        self.breakers = breakers or CircuitBreakerRegistry()
+        self.stats_counter = TransportStats()
+        self.stats_counter.metrics = metrics
+        self._session: Optional[requests.Session] = None
+        self._httpx_client: Any = None
+        self.http2 = http2 and self._http2_available()
+        if http2 and not self.http2:
+            logger.info("HTTP/2 requested but httpx[http2] is not installed; using HTTP/1.1 keep-alive")
+
+    # ------------------------- Public API -------------------------
+    @property
+    def session(self) -> requests.Session:
+        """The pooled requests.Session (HTTP/1.1 path)."""
+        if self._session is None:
+            import requests
+
+            session = requests.Session()
+            adapter = _counting_adapter_class()(
+                self.stats_counter,
+                pool_connections=self.max_hosts,
+                pool_maxsize=self.max_connections_per_host,
+                max_retries=self.max_retries,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"User-Agent": self.user_agent})
+            self._session = session
+        return self._session
+
+    def get(
+        self,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: float = 20,
+        stream: bool = False,
+        use_cache: bool = True,
+        before_send: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """GET through the shared pool; returns a requests-style response.
+        Plain (non-streaming, unconditional) GETs go through the response cache if set
+        and use_cache is true. before_send() runs only when the request actually goes
+        to the network, not when the cache answers it.
+        """
+        if self.cache is not None and use_cache and not stream and not headers:
+            return self.cache.fetch(
+                url, lambda conditional: self._send(url, conditional, timeout, False, before_send)
+            )
+        return self._send(url, headers, timeout, stream, before_send)
+
+    @property
+    def metrics(self) -> Optional["FetchMetrics"]:
+        return self.stats_counter.metrics
+
+    @metrics.setter
+    def metrics(self, metrics: Optional["FetchMetrics"]) -> None:
+        self.stats_counter.metrics = metrics
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests, new connections and reuse ratio, overall and per host.
+        New connections are counted on the HTTP/1.1 path; with HTTP/2 see http_versions.
+        """
+        return self.stats_counter.snapshot()
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._httpx_client is not None:
+            self._httpx_client.close()
+            self._httpx_client = None
+
+    # ------------------------- Internal -------------------------
+    def _send(
+        self,
+        url: str,
+        headers: Optional[Mapping[str, str]],
+        timeout: float,
+        stream: bool,
+        before_send: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        host = urlsplit(url).netloc
+        if before_send is not None:
+            before_send()
+        self.breakers.before_call(host)
+        self.stats_counter.request_sent(host)
+        try:
+            if self.http2:
+                resp = self._httpx_get(url, headers, timeout, stream)
+            else:
+                resp = self.session.get(url, headers=headers, timeout=timeout, stream=stream)
+                self.stats_counter.response_received("HTTP/1.1" if resp.raw.version == 11 else "HTTP/1.0")
+        except Exception:
+            self.breakers.record_failure(host)
+            raise
+        if resp.status_code >= 500:
+            self.breakers.record_failure(host)
+        else:
+            self.breakers.record_success(host)
+        return resp
+
+    @staticmethod
+    def _http2_available() -> bool:
+        return importlib.util.find_spec("httpx") is not None and importlib.util.find_spec("h2") is not None
+
+    def _httpx_get(self, url: str, headers: Optional[Mapping[str, str]], timeout: float, stream: bool) -> Any:
+        import httpx
+
+        if self._httpx_client is None:
+            self._httpx_client = httpx.Client(
+                headers={"User-Agent": self.user_agent},
+                follow_redirects=True,
+                transport=httpx.HTTPTransport(
+                    http2=True,
+                    retries=self.max_retries,
+                    limits=httpx.Limits(
+                        max_connections=self.max_hosts * self.max_connections_per_host,
+                        max_keepalive_connections=self.max_hosts,
+                    ),
+                ),
+            )
+        request = self._httpx_client.build_request("GET", url, headers=headers, timeout=timeout)
+        response = self._httpx_client.send(request, stream=stream)
+        self.stats_counter.response_received(response.http_version)
+        return _HttpxResponse(response)
@@ -3,24 +3,52 @@ from __future__ import annotations
 """
 Legal Compliance Module - Ensures ethical and legal web scraping for Harvest.ai
 This module is general-purpose and MUST remain in Harvest.ai (not QuizMentor).
+Importing it and making blacklist/robots.txt decisions stays cheap: requests, the
+HTML parsers and sitemap/audit support are only imported by the code paths that
+fetch or parse (see scripts/check_import_time.py).
 """
 
 import os
 import json
+import codecs
+import contextlib
+import random
+import threading
 import time
 import logging
-from dataclasses import dataclass
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from urllib.parse import urlparse
-from urllib.robotparser import RobotFileParser
+from typing import (
+    TYPE_CHECKING, Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple,
+)
+from urllib.parse import urlparse, urlsplit
 
-import requests
-from bs4 import BeautifulSoup
+from adaptive_pacing import AdaptivePacer, parse_retry_after
+from circuit_breaker import CircuitOpenError
+from domain_policy import DomainSuffixIndex, normalize_host
+from fetch_metrics import FetchMetrics
+from http_transport import HttpTransport
+from politeness import PolitenessScheduler
+from robots_matcher import MAX_ROBOTS_BYTES, CompiledRobots
+from ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from audit_log import AuditLog
+    from politeness_backends import PolitenessBackend
+    from sitemaps import SitemapEntry
 
 
 logger = logging.getLogger(__name__)
 
+# Stale robots.txt is revalidated by a small shared pool; refreshes beyond the
+# pending cap are dropped (the stale copy keeps being served and is retried on
+# a later lookup) rather than queued behind an unbounded backlog
+ROBOTS_REFRESH_WORKERS = 4
+ROBOTS_REFRESH_MAX_PENDING = 64
+
 
 @dataclass
 class ComplianceRules:
@@ -34,31 +62,195 @@ class ComplianceRules:
     last_checked: datetime
 
 
+@dataclass
+class RobotsRecord:
+    """Raw robots.txt state for one domain, persisted under ``cache_dir``."""
+    domain: str
+    robots_url: str
+    status: int
+    lines: List[str]
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, ttl: float, now: Optional[float] = None) -> bool:
+        return ((now if now is not None else time.time()) - self.fetched_at) < ttl
+
+    def to_parser(self) -> CompiledRobots:
+        """Build a parser; per RFC 9309 any 4xx means "no robots.txt", i.e. allow all."""
+        parser = CompiledRobots(self.robots_url)
+        if 400 <= self.status < 500:
+            parser.allow_all = True
+        else:
+            parser.parse(self.lines)
+        return parser
+
+
+@dataclass
+class RobotsFetchState:
+    """Failure/backoff bookkeeping for a domain whose robots.txt is unreachable."""
+    domain: str
+    failures: int = 0
+    last_error: str = ""
+    next_retry_at: float = 0.0
+
+
+def classify_robots_failure(exc: Exception) -> str:
+    """Bucket a robots.txt fetch error: timeout, server_error, rate_limited or connection_error."""
+    status = getattr(getattr(exc, "response", None), "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        return "rate_limited" if status == 429 else "server_error"
+    if any("Timeout" in cls.__name__ for cls in type(exc).__mro__):
+        return "timeout"
+    return "connection_error"
+
+
+@dataclass
+class ParsedPage:
+    """A page fetched once, shared by compliance and downstream analyzers.
+    The parse tree and text are built lazily on first access and then reused.
+    """
+    url: str
+    final_url: str
+    status_code: int
+    headers: Dict[str, str]
+    raw: bytes
+    html: str
+    compliance: Dict[str, object]
+    parser_backend: str
+    _soup: Any = field(default=None, repr=False)
+    _text: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def soup(self) -> Any:
+        if self._soup is None:
+            from html_text import parse_html
+
+            self._soup = parse_html(self.html, self.parser_backend)
+        return self._soup
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            from html_text import extract_text, soup_text
+
+            if self._soup is None and self.parser_backend == "selectolax":
+                self._text = extract_text(self.html, self.parser_backend)
+            else:
+                self._text = soup_text(self.soup)
+        return self._text
+
+
+class ContentRejectedError(ValueError):
+    """Raised by streaming fetches for non-HTML or oversized responses."""
+
+
+def html_to_text(
+    html: str, parser_backend: Optional[str] = None, timings: Optional[Dict[str, float]] = None
+) -> str:
+    """Strip scripts/styles and collapse whitespace into plain text."""
+    from html_text import extract_text
+
+    return extract_text(html, parser_backend, timings)
+
+
 class LegalComplianceEngine:
     """Ensures all web scraping activities are legal and ethical."""
 
-    def __init__(self, cache_dir: str = "./cache/compliance") -> None:
+    def __init__(
+        self,
+        cache_dir: str = "./cache/compliance",
+        robots_ttl: float = 24 * 3600,
+        robots_retry_base: float = 60.0,
+        robots_retry_max: float = 6 * 3600,
+        max_content_bytes: int = 10 * 1024 * 1024,
+        parser_backend: Optional[str] = None,
+        transport: Optional[HttpTransport] = None,
+        max_domains: int = 10_000,
+        max_decisions: int = 100_000,
+        decision_ttl: float = 300.0,
+        audit: Optional["AuditLog"] = None,
+        politeness_backend: Optional["PolitenessBackend"] = None,
+        metrics: Optional[FetchMetrics] = None,
+        pacing: Optional[AdaptivePacer] = None,
+        fetch_slot: Optional[Callable[[str], ContextManager[Any]]] = None,
+    ) -> None:
+        # Created on the first robots.txt write, not here
         self.cache_dir = cache_dir
-        os.makedirs(self.cache_dir, exist_ok=True)
-        self.robots_cache: Dict[str, RobotFileParser] = {}
-        self.domain_rules: Dict[str, ComplianceRules] = {}
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Harvest.ai/1.0 (https://harvest.ai; legal@harvest.ai) Educational Content Bot",
-        })
+        # robots.txt is reused from disk for robots_ttl seconds, then revalidated.
+        # In-memory per-domain state is LRU-bounded to max_domains; evicted
+        # robots.txt is reloaded from the disk cache on next use.
+        self.robots_ttl = robots_ttl
+        self.robots_cache: TTLCache = TTLCache(max_entries=max_domains)
+        self.robots_records: TTLCache = TTLCache(max_entries=max_domains)
+        # Unreachable robots.txt (timeouts, 5xx, 429) is retried with jittered
+        # exponential backoff; meanwhile the last known good rules are served,
+        # or the domain is disallowed if we never had any (RFC 9309 2.3.1.4)
+        self.robots_retry_base = robots_retry_base
+        self.robots_retry_max = robots_retry_max
+        self.robots_fetch_state: Dict[str, RobotsFetchState] = {}
+        self.robots_failure_counts: Dict[str, int] = defaultdict(int)
+        self._robots_refreshing: Set[str] = set()
+        # Guards the three above: background refresh threads update them while
+        # decisions, stats and snapshots read them
+        self._robots_lock = threading.RLock()
+        # Runs background revalidations of stale robots.txt; created on first use
+        self._robots_refresh_pool: Optional["ThreadPoolExecutor"] = None
+        # Body budget for streaming fetches (scrape_content(..., stream=True))
+        self.max_content_bytes = max_content_bytes
+        # HTML parser used for text extraction ("html.parser", "lxml", "selectolax", "auto");
+        # the default is resolved on first use so decision-only callers never import a parser
+        self._parser_backend: Optional[str] = None
+        if parser_backend is not None:
+            from html_text import resolve_backend
+
+            self._parser_backend = resolve_backend(parser_backend)
+        self.domain_rules: TTLCache = TTLCache(max_entries=max_domains)
+        # check_compliance results keyed by (host, robots.txt decision scope), so URLs
+        # the host's rules cannot tell apart share one entry. Entries expire after decision_ttl and are dropped per host when
+        # its robots.txt changes; call invalidate_decisions() after editing policy lists.
+        self.decision_ttl = decision_ttl
+        self.decisions: TTLCache = TTLCache(
+            max_entries=max_decisions, ttl=decision_ttl, group=lambda key: normalize_host(key[0])
+        )
+        # Per-domain crawl-delay / rate_limit pacing shared by every fetch; pass a
+        # shared politeness_backend when several worker processes crawl together
+        self.scheduler = PolitenessScheduler(max_crawl_delay=5.0, backend=politeness_backend)
+        # Slows a domain down on errors, latency spikes and Retry-After, and speeds it
+        # back up to the rules' crawl_delay while it is healthy (capped like the scheduler)
+        self.pacing = pacing or AdaptivePacer(max_delay=5.0)
+        # Optional fetch_slot(url) context held around each page/sitemap transfer only,
+        # entered after the compliance check and politeness wait (e.g. a concurrency
+        # limit that sleeping fetches should not occupy)
+        self.fetch_slot = fetch_slot
+        # Optional append-only record of every decision and fetch (see audit_log.AuditLog)
+        self.audit = audit
+        # Per-phase latency histograms and counters (robots, politeness, connect,
+        # download, parse, text); read with metrics.snapshot() or metrics.to_prometheus()
+        self.metrics = metrics or FetchMetrics()
+        # Shared connection pool for robots.txt and page fetches; pass the same
+        # transport to other scrapers so connections are reused across them.
+        # Created on first fetch when not given.
+        self._transport = transport
+        if transport is not None and transport.metrics is None:
+            transport.metrics = self.metrics
+
+        # Domain lists match whole-label suffixes: "medium.com" covers "blog.medium.com"
+        # but not "notmedium.com". Large curated lists can be loaded with
+        # DomainSuffixIndex.from_file() without slowing per-URL checks.
 
         # Whitelist of explicitly allowed educational sources
-        self.educational_whitelist = {
+        self.educational_whitelist = DomainSuffixIndex({
             "docs.python.org",
             "developer.mozilla.org",
             "w3schools.com",
             "wikipedia.org",
             "github.com",  # Prefer API where possible
             "stackoverflow.com",  # Prefer API
-        }
+        })
 
         # Blacklist of sources we never scrape
-        self.blacklist = {
+        self.blacklist = DomainSuffixIndex({
             "facebook.com",
             "instagram.com",
             "linkedin.com",
@@ -66,26 +258,384 @@ class LegalComplianceEngine:
             "medium.com",
             "substack.com",
             "patreon.com",
-        }
+        })
+
+        # Sources with official APIs we should use instead of scraping
+        self.known_apis = DomainSuffixIndex({
+            "wikipedia.org": {"docs": "https://www.mediawiki.org/wiki/API:Main_page"},
+            "github.com": {"docs": "https://docs.github.com/en/rest"},
+            "stackoverflow.com": {"docs": "https://api.stackexchange.com/"},
+        })
+
+    @property
+    def transport(self) -> HttpTransport:
+        if self._transport is None:
+            self._transport = HttpTransport(metrics=self.metrics)
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport: HttpTransport) -> None:
+        self._transport = transport
+
+    @property
+    def parser_backend(self) -> str:
+        if self._parser_backend is None:
+            from html_text import resolve_backend
+
+            self._parser_backend = resolve_backend(None)
+        return self._parser_backend
+
+    @parser_backend.setter
+    def parser_backend(self, backend: Optional[str]) -> None:
+        from html_text import resolve_backend
+
+        self._parser_backend = resolve_backend(backend)
+
+    @property
+    def session(self) -> Any:
+        """The transport's underlying requests.Session (kept for existing callers)."""
+        return self.transport.session
+
+    @property
+    def user_agent(self) -> str:
+        return self.transport.user_agent
 
     # ------------------------- Public API -------------------------
     def check_compliance(self, url: str) -> Tuple[bool, Dict[str, object]]:
         """Check if we can legally scrape this URL.
         Returns (allowed, info_dict).
         """
-        domain = urlparse(url).netloc
+        decision = self._evaluate(url)
+        if self.audit is not None:
+            self._audit(url, decision, "check")
+        return decision
 
-        # Blacklist
-        if any(blocked in domain for blocked in self.blacklist):
-            return False, {
+    def invalidate_decisions(self, domain: Optional[str] = None) -> int:
+        """Forget cached check_compliance results for ``domain`` and its subdomains,
+        or for every host when ``domain`` is None. Returns how many were dropped.
+        """
+        if domain is None:
+            dropped = len(self.decisions)
+            self.decisions.clear()
+            self.domain_rules.clear()
+            return dropped
+        suffix = normalize_host(domain)
+
+        def covered(host: object) -> bool:
+            return host == suffix or str(host).endswith("." + suffix)
+
+        for cached in [d for d in self.domain_rules if covered(normalize_host(d))]:
+            self.domain_rules.invalidate(cached)
+        return self.decisions.invalidate_groups(covered)
+
+    def decision_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss/expiry/eviction/invalidation counters for the bounded caches."""
+        return {
+            "decisions": self.decisions.stats(),
+            "domain_rules": self.domain_rules.stats(),
+            "robots": self.robots_cache.stats(),
+        }
+
+    def check_compliance_many(self, urls: Iterable[str]) -> Iterator[Tuple[str, bool, str]]:
+        """Bulk variant of check_compliance for pre-filtering a frontier.
+        Yields (url, allowed, reason) in input order; reason is "" when allowed.
+        Blacklist, robots.txt, API and TOS state is resolved once per host.
+        Each decision is counted and audited as a "check" event, as check_compliance does.
+        """
+        user_agent = self.user_agent
+        hosts: Dict[str, Tuple[str, Optional[CompiledRobots], str]] = {}
+        for url in urls:
+            scheme, domain = urlsplit(url)[:2]
+            state = hosts.get(domain)
+            if state is None:
+                state = hosts[domain] = self._host_compliance_state(scheme, domain)
+            host_reason, parser, post_robots_reason = state
+            if host_reason:
+                reason = host_reason
+            elif not parser.can_fetch(user_agent, url):  # type: ignore[union-attr]
+                reason = self._robots_block_reason(domain)
+            else:
+                reason = post_robots_reason
+            decision: Tuple[bool, Dict[str, object]] = (not reason, {"reason": reason})
+            self._count_decision(domain, decision)
+            if self.audit is not None:
+                self._audit(url, decision, "check")
+            yield url, not reason, reason
+
+    def robots_failure_stats(self) -> Dict[str, object]:
+        """Failure counters by kind plus domains currently backing off."""
+        now = time.time()
+        with self._robots_lock:
+            return {
+                "counts": dict(self.robots_failure_counts),
+                "backing_off": {
+                    domain: {
+                        "failures": state.failures,
+                        "last_error": state.last_error,
+                        "retry_in_s": round(max(0.0, state.next_retry_at - now), 1),
+                        "serving_stale": domain in self.robots_records,
+                    }
+                    for domain, state in self.robots_fetch_state.items()
+                },
+            }
+
+    def warm_up(self, domains: Iterable[str], max_workers: int = 16, scheme: str = "https") -> Dict[str, str]:
+        """Fetch robots.txt for a planned crawl's domains in parallel, filling the robots
+        and rule caches so the first URL per domain is a cache hit. The fetch also
+        leaves a keep-alive connection in the transport's pool, which holds at most
+        ``transport.max_hosts`` hosts: domains are warmed in chunks of that size, the
+        first chunk last, so the domains listed first keep their connections.
+        ``domains`` are hosts ("example.com") or URLs; returns domain -> robots state.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        targets: Dict[str, str] = {}
+        for item in domains:
+            parts = urlsplit(item if "://" in item else f"{scheme}://{item}")
+            targets.setdefault(parts.netloc, parts.scheme)
+        if not targets:
+            return {}
+        items = list(targets.items())
+        size = max(1, self.transport.max_hosts)
+        chunks = [items[start:start + size] for start in range(0, len(items), size)]
+        states: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(targets)), thread_name_prefix="robots-warm-up") as pool:
+            for chunk in reversed(chunks):
+                states.update(zip(
+                    (domain for domain, _ in chunk), pool.map(lambda target: self._warm_domain(*target), chunk)
+                ))
+        return {domain: states[domain] for domain in targets}
+
+    def export_snapshot(self, path: str) -> int:
+        """Write the robots.txt records and backoff state held in memory to one JSON
+        file that other workers can load_snapshot() without fetching. Returns records written.
+        """
+        records = [asdict(record) for record in self.robots_records.values()]
+        with self._robots_lock:
+            fetch_state = [asdict(state) for state in self.robots_fetch_state.values()]
+        snapshot = {
+            "version": 1,
+            "created_at": time.time(),
+            "records": records,
+            "fetch_state": fetch_state,
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(snapshot, fh)
+        os.replace(tmp, path)
+        return len(records)
+
+    def load_snapshot(self, path: str) -> int:
+        """Load an export_snapshot() file; records older than ones already held are
+        skipped. Returns records loaded. Loaded records are kept in memory only.
+        """
+        with open(path, "r", encoding="utf-8") as fh:
+            snapshot = json.load(fh)
+        if snapshot.get("version") != 1:
+            raise ValueError(f"Unsupported compliance snapshot version: {snapshot.get('version')!r}")
+        loaded = 0
+        for data in snapshot["records"]:
+            record = RobotsRecord(**data)
+            current = self.robots_records.get(record.domain)
+            if current is not None and current.fetched_at >= record.fetched_at:
+                continue
+            self._store_robots_record(record)
+            loaded += 1
+        now = time.time()
+        for data in snapshot["fetch_state"]:
+            state = RobotsFetchState(**data)
+            with self._robots_lock:
+                if state.next_retry_at > now and state.domain not in self.robots_fetch_state:
+                    self.robots_fetch_state[state.domain] = state
+        return loaded
+
+    def enqueue(self, url: str) -> Tuple[bool, Dict[str, object]]:
+        """Check compliance and, if allowed, queue the URL on the politeness scheduler.
+        Use ``scheduler.next_url()`` to pull fetchable URLs across domains.
+        """
+        allowed, info = self.check_compliance(url)
+        if allowed:
+            rules: ComplianceRules = info["rules"]  # type: ignore[assignment]
+            crawl_delay = self.pacing.crawl_delay(rules.domain, rules.crawl_delay)
+            self.scheduler.add(url, crawl_delay=crawl_delay, rate_limit=rules.rate_limit)
+        return allowed, info
+
+    def fetch_page(self, url: str) -> ParsedPage:
+        """Check compliance, honor politeness and fetch a URL exactly once.
+        Raises PermissionError when the URL may not be scraped.
+        """
+        info = self._prepare_fetch(url, wait=False)
+        rules: ComplianceRules = info["rules"]  # type: ignore[assignment]
+        domain = str(info["domain"])
+        sent = False
+        started = time.perf_counter()
+        with contextlib.ExitStack() as transfer:
+            def before_send() -> None:
+                # Only requests that reach the network wait out politeness and take
+                # a transfer slot; a fresh response-cache hit needs neither
+                nonlocal sent, started
+                if sent:
+                    return
+                sent = True
+                self._politeness_wait(rules)
+                transfer.enter_context(self._transfer_slot(url))
+                started = time.perf_counter()
+
+            try:
+                resp = self.transport.get(url, timeout=20, before_send=before_send)
+                raw = resp.content
+            except CircuitOpenError:
+                raise  # refused before sending: nothing was downloaded and the host said nothing
+            except Exception as exc:
+                self.metrics.observe("download", time.perf_counter() - started, domain, type(exc).__name__)
+                self._pace(domain, None, time.perf_counter() - started)
+                raise
+            elapsed = time.perf_counter() - started
+        self.metrics.observe("download", elapsed, domain, str(resp.status_code) if sent else "cached")
+        self.metrics.count("bytes", domain, str(resp.status_code), len(raw))
+        if sent:
+            self._pace(domain, resp.status_code, elapsed, resp.headers)
+        resp.raise_for_status()
+        return ParsedPage(
+            url=url,
+            final_url=resp.url,
+            status_code=resp.status_code,
+            headers=dict(resp.headers),
+            raw=raw,
+            html=resp.text,
+            compliance=info,
+            parser_backend=self.parser_backend,
+        )
+
+    def sitemap_urls(self, url: str) -> List[str]:
+        """Sitemaps advertised in robots.txt for url's host, else the conventional /sitemap.xml."""
+        parts = urlsplit(url)
+        base = f"{parts.scheme}://{parts.netloc}"
+        parser = self._get_robots_parser(parts.netloc, f"{base}/robots.txt")
+        return parser.site_maps() or [f"{base}/sitemap.xml"]
+
+    def iter_sitemap_entries(
+        self, url: str, since: Optional[datetime] = None, max_depth: int = 3
+    ) -> Iterator["SitemapEntry"]:
+        """Lazily yield page URLs (with lastmod) from the host's sitemaps and sitemap indexes.
+        Each sitemap fetch is compliance-checked and paced like a page fetch; gzip is handled.
+        """
+        from sitemaps import SitemapReader
+
+        reader = SitemapReader(self._open_sitemap, max_depth=max_depth)
+        return reader.iter_entries(self.sitemap_urls(url), since=since)
+
+    def scrape_content(self, url: str, stream: bool = False) -> str:
+        """Fetch page content after compliance checks. Returns plain text.
+        With stream=True the body is checked for an HTML Content-Type, capped at
+        max_content_bytes and converted to text chunk by chunk.
+        """
+        if not stream:
+            page = self.fetch_page(url)
+            timings: Dict[str, float] = {}
+            text = html_to_text(page.html, self.parser_backend, timings)
+            self._observe_extraction(page.compliance["domain"], timings)  # type: ignore[arg-type]
+            return text
+        info = self._prepare_fetch(url)
+        with self._transfer_slot(url):
+            return self._stream_text(url, str(info["domain"]))
+
+    # ------------------------- Internal -------------------------
+    def _decision_key(self, url: str) -> Tuple[str, str]:
+        """(netloc, robots.txt decision scope); the full path and query until the
+        host's robots.txt is loaded, so URLs its rules cannot tell apart share a decision.
+        """
+        parts = urlsplit(url)
+        parser = self.robots_cache.peek(parts.netloc)
+        if parser is not None:
+            return parts.netloc, parser.decision_scope(self.user_agent, url)
+        path = parts.path or "/"
+        return parts.netloc, f"{path}?{parts.query}" if parts.query else path
+
+    def _evaluate(self, url: str) -> Tuple[bool, Dict[str, object]]:
+        key = self._decision_key(url)
+        decision = self._cached_decision(key)
+        if decision is None:
+            decision = self._decide(url, key)
+        self._count_decision(key[0], decision)
+        return decision
+
+    def _count_decision(self, domain: str, decision: Tuple[bool, Dict[str, object]]) -> None:
+        allowed, info = decision
+        self.metrics.count("decision", domain, "allowed" if allowed else str(info["reason"]))
+
+    def _audit(self, url: str, decision: Tuple[bool, Dict[str, object]], event: str) -> None:
+        allowed, info = decision
+        netloc = urlsplit(url).netloc
+        domain = normalize_host(netloc)
+        from audit_log import AuditRecord
+
+        self.audit.append(AuditRecord(  # type: ignore[union-attr]
+            ts=time.time(),
+            domain=domain,
+            url=url,
+            event=event,
+            allowed=allowed,
+            reason=str(info.get("reason", "")),
+            robots_state=self._robots_state(netloc, str(info.get("reason", ""))),
+            attribution_required=bool(
+                info.get("attribution_required", not self.educational_whitelist.matches(domain))
+            ),
+        ))
+
+    def _robots_state(self, domain: str, reason: str) -> str:
+        """fresh / stale / missing (4xx, allow all) / unreachable[_stale] / not_checked."""
+        if reason == "blacklisted_domain":
+            return "not_checked"
+        record = self.robots_records.get(domain)
+        with self._robots_lock:
+            unreachable = domain in self.robots_fetch_state
+        if unreachable:
+            return "unreachable_stale" if record is not None else "unreachable"
+        if record is None:
+            return "unknown"
+        if 400 <= record.status < 500:
+            return "missing"
+        return "fresh" if record.is_fresh(self.robots_ttl) else "stale"
+
+    def _cached_decision(self, key: Tuple[str, str]) -> Optional[Tuple[bool, Dict[str, object]]]:
+        if key[1] and (key[0], "") in self.decisions:
+            key = (key[0], "")  # host-wide decisions (blacklist, all-or-nothing robots.txt)
+        return self.decisions.get(key)
+
+    def _decide(self, url: str, key: Tuple[str, str]) -> Tuple[bool, Dict[str, object]]:
+        """Uncached check_compliance; stores the result in the decision cache."""
+        domain = key[0]
+
+        # Blacklist (applies to the whole host, so it is cached under the "" path)
+        if self._is_blacklisted(domain):
+            decision: Tuple[bool, Dict[str, object]] = (False, {
                 "reason": "blacklisted_domain",
                 "message": f"{domain} is on our no-scrape list",
-            }
+            })
+            self.decisions.set((domain, ""), decision)
+            return decision
+
+        decision = self._decide_after_blacklist(url, domain)
+        with self._robots_lock:
+            state = self.robots_fetch_state.get(domain)
+        ttl = self.decision_ttl
+        if state is not None:
+            # Don't keep serving an "unreachable robots.txt" answer past the retry time
+            ttl = min(ttl, max(0.0, state.next_retry_at - time.time()))
+        # robots.txt is loaded now, so the key can narrow to its decision scope
+        self.decisions.set(self._decision_key(url), decision, ttl=ttl)
+        return decision
 
+    def _decide_after_blacklist(self, url: str, domain: str) -> Tuple[bool, Dict[str, object]]:
         # robots.txt
         robots_ok, robots_info = self._check_robots_txt(url)
         if not robots_ok:
-            return False, {"reason": "robots_txt_disallowed", "message": robots_info}
+            reason = self._robots_block_reason(domain)
+            if reason == "robots_txt_unreachable":
+                robots_info = f"robots.txt for {domain} is unreachable and was never fetched; disallowing until retry"
+            return False, {"reason": reason, "message": robots_info}
 
         # Prefer official APIs when present
         api_info = self._check_api_availability(domain)
@@ -109,72 +659,392 @@ class LegalComplianceEngine:
             "rules": rules,
         }
 
-    def scrape_content(self, url: str) -> str:
-        """Fetch page content after compliance checks. Returns plain text."""
-        allowed, info = self.check_compliance(url)
+    def _prepare_fetch(self, url: str, wait: bool = True) -> Dict[str, object]:
+        """Compliance check plus (unless wait is false) politeness wait; returns the compliance info."""
+        allowed, info = decision = self._evaluate(url)
+        if self.audit is not None:
+            self._audit(url, decision, "fetch")
         if not allowed:
             raise PermissionError(f"Scrape blocked: {info}")
 
         rules: ComplianceRules = info["rules"]  # type: ignore[index]
-        if rules.crawl_delay > 0:
-            time.sleep(min(rules.crawl_delay, 5.0))
+        self._check_breaker(rules.domain)
+        if wait:
+            self._politeness_wait(rules)
+        return info
 
-        resp = self.session.get(url, timeout=20)
-        resp.raise_for_status()
+    def _politeness_wait(self, rules: ComplianceRules) -> None:
+        """Reserve the domain's next politeness slot and sleep until it comes up."""
+        crawl_delay = self.pacing.crawl_delay(rules.domain, rules.crawl_delay)
+        wait = self.scheduler.reserve(rules.domain, crawl_delay, rules.rate_limit)
+        self.metrics.observe("politeness_wait", max(0.0, wait), rules.domain)
+        if wait > 0:
+            time.sleep(wait)
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        # Remove script/style
-        for tag in soup(["script", "style", "noscript"]):
-            tag.extract()
-        text = soup.get_text(" ")
-        return " ".join(text.split())
+    def _check_breaker(self, domain: str) -> None:
+        """Fail fast, before any politeness wait, while the host's circuit breaker is
+        open; queued URLs for it are deferred until the breaker's next probe.
+        Breakers are keyed by netloc, like the transport and the decision cache.
+        """
+        retry_in = self.transport.breakers.retry_in(domain)
+        if retry_in > 0:
+            self.metrics.count("circuit_open", domain)
+            self.scheduler.defer(domain, retry_in)
+            raise CircuitOpenError(domain, retry_in)
+
+    def _pace(
+        self, domain: str, status: Optional[int], seconds: float, headers: Optional[Mapping[str, str]] = None
+    ) -> None:
+        """Feed a page response (status None: transport error) back into adaptive pacing."""
+        retry_after = None
+        if headers is not None and status in (429, 503):
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+        pause = self.pacing.record(domain, status, seconds, retry_after)
+        if pause > 0:
+            logger.info("%s asked us to retry after %.0fs; pausing the domain", domain, pause)
+            self.scheduler.defer(domain, pause)
+
+    def _transfer_slot(self, url: str) -> ContextManager[Any]:
+        return self.fetch_slot(url) if self.fetch_slot is not None else contextlib.nullcontext()
+
+    def _open_sitemap(self, sitemap_url: str) -> Iterator[bytes]:
+        self._prepare_fetch(sitemap_url)
+        with self._transfer_slot(sitemap_url):
+            resp = self.transport.get(sitemap_url, timeout=20, stream=True)
+            try:
+                resp.raise_for_status()
+                yield from resp.iter_content(chunk_size=64 * 1024)
+            finally:
+                resp.close()
+
+    def _observe_extraction(self, domain: str, timings: Mapping[str, float]) -> None:
+        for phase in ("parse", "text"):
+            if phase in timings:
+                self.metrics.observe(phase, timings[phase], domain)
+
+    def _stream_text(self, url: str, domain: str) -> str:
+        """Streamed download with incremental text extraction, timed as one "download" phase."""
+        started = time.perf_counter()
+        try:
+            resp = self.transport.get(url, timeout=20, stream=True)
+        except CircuitOpenError:
+            raise  # refused before sending: nothing was downloaded and the host said nothing
+        except Exception as exc:
+            self.metrics.observe("download", time.perf_counter() - started, domain, type(exc).__name__)
+            self._pace(domain, None, time.perf_counter() - started)
+            raise
+        self._pace(domain, resp.status_code, time.perf_counter() - started, resp.headers)
+        outcome = str(resp.status_code)
+        try:
+            resp.raise_for_status()
+            self._check_stream_headers(url, resp.headers)
+            decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+            from html_text import HTMLTextExtractor
+
+            extractor = HTMLTextExtractor()
+            received = 0
+            for chunk in resp.iter_content(chunk_size=64 * 1024):
+                received += len(chunk)
+                if received > self.max_content_bytes:
+                    raise ContentRejectedError(
+                        f"{url} exceeds max_content_bytes ({self.max_content_bytes})"
+                    )
+                extractor.feed(decoder.decode(chunk))
+            extractor.feed(decoder.decode(b"", final=True))
+            text = extractor.close()
+            self.metrics.count("bytes", domain, outcome, received)
+            return text
+        except ContentRejectedError:
+            outcome = "rejected"
+            raise
+        finally:
+            resp.close()
+            self.metrics.observe("download", time.perf_counter() - started, domain, outcome)
+
+    def _check_stream_headers(self, url: str, headers: Mapping[str, str]) -> None:
+        """Reject a streaming response before its body is read."""
+        from html_text import is_html_content_type
+
+        content_type = headers.get("Content-Type", "")
+        if not is_html_content_type(content_type):
+            raise ContentRejectedError(f"{url} is not HTML ({content_type})")
+        declared = headers.get("Content-Length", "")
+        if declared.isdigit() and int(declared) > self.max_content_bytes:
+            raise ContentRejectedError(
+                f"{url} declares {declared} bytes, over max_content_bytes ({self.max_content_bytes})"
+            )
+
+    def _host_compliance_state(
+        self, scheme: str, domain: str
+    ) -> Tuple[str, Optional[CompiledRobots], str]:
+        """Per-host decisions for check_compliance_many, in check_compliance order:
+        (reason before robots, robots parser, reason after robots).
+        """
+        if self._is_blacklisted(domain):
+            return "blacklisted_domain", None, ""
+        parser = self._get_robots_parser(domain, f"{scheme}://{domain}/robots.txt")
+        if self._check_api_availability(domain) is not None:
+            return "", parser, "api_available"
+        if not self._check_terms_of_service(domain):
+            return "", parser, "terms_violation"
+        return "", parser, ""
+
+    def _is_blacklisted(self, domain: str) -> bool:
+        return self.blacklist.matches(domain)
 
-    # ------------------------- Internal -------------------------
     def _check_robots_txt(self, url: str) -> Tuple[bool, str]:
         domain = urlparse(url).netloc
         base = f"{urlparse(url).scheme}://{domain}"
-        robots_url = f"{base}/robots.txt"
+        parser = self._get_robots_parser(domain, f"{base}/robots.txt")
+
+        can_fetch = bool(parser.can_fetch(self.user_agent, url))
+        crawl_delay = float(parser.crawl_delay(self.user_agent) or 1.0)
+        sitemaps = parser.site_maps()
+        sitemap_url = sitemaps[0] if sitemaps else None
+
+        # Update domain rules cache; unchanged rules are reused rather than rebuilt
+        rules = self.domain_rules.get(domain)
+        if rules is None or (rules.can_fetch, rules.crawl_delay, rules.sitemap_url) != (
+            can_fetch, crawl_delay, sitemap_url
+        ):
+            self.domain_rules[domain] = ComplianceRules(
+                domain=domain,
+                can_fetch=can_fetch,
+                crawl_delay=crawl_delay,
+                rate_limit=30,
+                disallowed_paths=[],
+                sitemap_url=sitemap_url,
+                attribution_required=not self.educational_whitelist.matches(domain),
+                last_checked=datetime.utcnow(),
+            )
+
+        if not can_fetch:
+            return False, f"robots.txt disallows scraping: {url}"
+        return True, "robots.txt allows scraping"
+
+    def _robots_block_reason(self, domain: str) -> str:
+        """Why robots.txt blocks ``domain``: its rules disallow the URL, or it is
+        unreachable with no last known good copy (RFC 9309 2.3.1.4 disallow-all).
+        """
+        with self._robots_lock:
+            unreachable = domain in self.robots_fetch_state
+        if unreachable and self.robots_records.get(domain) is None:
+            return "robots_txt_unreachable"
+        return "robots_txt_disallowed"
 
+    def _get_robots_parser(self, domain: str, robots_url: str) -> CompiledRobots:
+        parser, record, due = self._robots_lookup(domain)
+        if not due:
+            return parser  # type: ignore[return-value]
+        if parser is not None and record is not None:
+            # Stale but known good: serve it and revalidate in the background
+            self._refresh_robots_in_background(domain, robots_url, record)
+            return parser
+        return self._refresh_robots(domain, robots_url, record)
+
+    def _robots_lookup(
+        self, domain: str
+    ) -> Tuple[Optional[CompiledRobots], Optional[RobotsRecord], bool]:
+        """(parser to serve now, last known good record, whether a fetch is due)."""
         parser = self.robots_cache.get(domain)
-        if parser is None:
-            parser = RobotFileParser()
-            parser.set_url(robots_url)
+        record = self.robots_records.get(domain)
+        with self._robots_lock:
+            state = self.robots_fetch_state.get(domain)
+            refreshing = domain in self._robots_refreshing
+        if record is None:
+            record = self._load_robots_record(domain)
+            if record is not None:
+                parser = self._store_robots_record(record)
+        elif parser is None:
+            parser = self._store_robots_record(record)  # parser was LRU-evicted
+        if state is not None and time.time() < state.next_retry_at:
+            return parser or self._disallow_all_parser(domain, ""), record, False
+        if refreshing:
+            return parser, record, parser is None
+        return parser, record, record is None or not record.is_fresh(self.robots_ttl)
+
+    def _refresh_robots(
+        self, domain: str, robots_url: str, record: Optional[RobotsRecord]
+    ) -> CompiledRobots:
+        started = time.perf_counter()
+        try:
+            fresh = self._fetch_robots_record(domain, robots_url, record)
+        except Exception as exc:
+            self.metrics.observe("robots_fetch", time.perf_counter() - started, domain, classify_robots_failure(exc))
+            return self._robots_fetch_failed(domain, robots_url, record, exc)
+        self.metrics.observe("robots_fetch", time.perf_counter() - started, domain, str(fresh.status))
+        return self._robots_fetch_succeeded(fresh)
+
+    def _refresh_robots_in_background(self, domain: str, robots_url: str, record: RobotsRecord) -> None:
+        with self._robots_lock:
+            if domain in self._robots_refreshing:
+                return
+            if len(self._robots_refreshing) >= ROBOTS_REFRESH_MAX_PENDING:
+                self.metrics.count("robots_refresh_dropped", domain)
+                return
+            self._robots_refreshing.add(domain)
+            if self._robots_refresh_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._robots_refresh_pool = ThreadPoolExecutor(
+                    max_workers=ROBOTS_REFRESH_WORKERS, thread_name_prefix="robots-refresh"
+                )
+            pool = self._robots_refresh_pool
+
+        def refresh() -> None:
             try:
-                parser.read()
-            except Exception as exc:
-                logger.warning("robots.txt read failed for %s: %s", domain, exc)
-            self.robots_cache[domain] = parser
+                self._refresh_robots(domain, robots_url, record)
+            finally:
+                with self._robots_lock:
+                    self._robots_refreshing.discard(domain)
 
-        can_fetch = parser.can_fetch(self.session.headers.get("User-Agent", "*"), url)
-        crawl_delay = parser.crawl_delay(self.session.headers.get("User-Agent", "*")) or 1.0
+        pool.submit(refresh)
 
-        # Update domain rules cache
-        rules = ComplianceRules(
+    def _robots_fetch_succeeded(self, record: RobotsRecord) -> CompiledRobots:
+        self._save_robots_record(record)
+        with self._robots_lock:
+            self.robots_fetch_state.pop(record.domain, None)
+        return self._store_robots_record(record)
+
+    def _robots_fetch_failed(
+        self, domain: str, robots_url: str, record: Optional[RobotsRecord], exc: Exception
+    ) -> CompiledRobots:
+        kind = classify_robots_failure(exc)
+        with self._robots_lock:
+            self.robots_failure_counts[kind] += 1
+            state = self.robots_fetch_state.setdefault(domain, RobotsFetchState(domain))
+            state.failures += 1
+            state.last_error = kind
+            delay = min(self.robots_retry_max, self.robots_retry_base * 2 ** (state.failures - 1))
+            state.next_retry_at = time.time() + random.uniform(delay / 2, delay)
+            if record is not None:
+                self.robots_failure_counts["served_stale"] += 1
+
+        if record is not None:
+            logger.warning("robots.txt %s for %s; serving last known good rules: %s", kind, domain, exc)
+            return self.robots_cache.get(domain) or self._store_robots_record(record)
+
+        logger.warning("robots.txt %s for %s; disallowing until retry: %s", kind, domain, exc)
+        return self._disallow_all_parser(domain, robots_url)
+
+    def _warm_domain(self, domain: str, scheme: str) -> str:
+        if self._is_blacklisted(domain):
+            return self._robots_state(domain, "blacklisted_domain")
+        robots_url = f"{scheme}://{domain}/robots.txt"
+        parser, record, due = self._robots_lookup(domain)
+        if due:
+            self._refresh_robots(domain, robots_url, record)
+        self._check_robots_txt(f"{scheme}://{domain}/")  # fills domain_rules
+        return self._robots_state(domain, "")
+
+    def _disallow_all_parser(self, domain: str, robots_url: str) -> CompiledRobots:
+        parser = CompiledRobots(robots_url)
+        parser.disallow_all = True
+        self.robots_cache[domain] = parser
+        self.decisions.invalidate_group(normalize_host(domain))
+        return parser
+
+    def _fetch_robots_record(
+        self, domain: str, robots_url: str, previous: Optional[RobotsRecord]
+    ) -> RobotsRecord:
+        """Fetch robots.txt, revalidating ``previous`` with a conditional GET.
+        Only the first MAX_ROBOTS_BYTES of the body are downloaded.
+        """
+        # Streamed, so never through the page cache: robots.txt revalidates via its RobotsRecord
+        resp = self.transport.get(
+            robots_url, headers=self._robots_request_headers(previous), timeout=10, stream=True
+        )
+        try:
+            if self._robots_status_unreachable(resp.status_code):
+                resp.raise_for_status()
+            body = bytearray()
+            for chunk in resp.iter_content(chunk_size=64 * 1024):
+                body += chunk
+                if len(body) >= MAX_ROBOTS_BYTES:
+                    break  # the rest would be ignored by the parser anyway
+        finally:
+            resp.close()
+        return self._robots_record_from_response(
+            domain, robots_url, resp.status_code, resp.headers, bytes(body), previous
+        )
+
+    @staticmethod
+    def _robots_status_unreachable(status: int) -> bool:
+        """5xx and 429 mean "unreachable" (retry later), unlike other 4xx."""
+        return status >= 500 or status == 429
+
+    @staticmethod
+    def _robots_request_headers(previous: Optional[RobotsRecord]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        return headers
+
+    @staticmethod
+    def _robots_record_from_response(
+        domain: str,
+        robots_url: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+        previous: Optional[RobotsRecord],
+    ) -> RobotsRecord:
+        if status == 304 and previous is not None:
+            previous.fetched_at = time.time()
+            return previous
+        lines = body[:MAX_ROBOTS_BYTES].decode("utf-8", errors="replace").splitlines() if status < 400 else []
+        return RobotsRecord(
             domain=domain,
-            can_fetch=bool(can_fetch),
-            crawl_delay=float(crawl_delay),
-            rate_limit=30,
-            disallowed_paths=[],
-            sitemap_url=None,
-            attribution_required=(domain not in self.educational_whitelist),
-            last_checked=datetime.utcnow(),
+            robots_url=robots_url,
+            status=status,
+            lines=lines,
+            fetched_at=time.time(),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
         )
-        self.domain_rules[domain] = rules
 
-        if not can_fetch:
-            return False, f"robots.txt disallows scraping: {url}"
-        return True, "robots.txt allows scraping"
+    def _store_robots_record(self, record: RobotsRecord) -> CompiledRobots:
+        previous = self.robots_records.get(record.domain)
+        parser = record.to_parser()
+        self.robots_records[record.domain] = record
+        self.robots_cache[record.domain] = parser
+        if previous is None or (previous.status, previous.lines) != (record.status, record.lines):
+            # Decisions made against the previous rules no longer hold
+            self.decisions.invalidate_group(normalize_host(record.domain))
+            self.domain_rules.invalidate(record.domain)
+        return parser
+
+    def _robots_record_path(self, domain: str) -> str:
+        safe = "".join(c if c.isalnum() or c in ".-" else "_" for c in domain.lower())
+        return os.path.join(self.cache_dir, "robots", f"{safe}.json")
+
+    def _load_robots_record(self, domain: str) -> Optional[RobotsRecord]:
+        path = self._robots_record_path(domain)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                return RobotsRecord(**json.load(fh))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning("Ignoring unreadable robots cache %s: %s", path, exc)
+            return None
+
+    def _save_robots_record(self, record: RobotsRecord) -> None:
+        path = self._robots_record_path(record.domain)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(asdict(record), fh)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Could not persist robots cache for %s: %s", record.domain, exc)
 
     def _check_api_availability(self, domain: str) -> Optional[Dict[str, str]]:
-        known_apis = {
-            "wikipedia.org": {"docs": "https://www.mediawiki.org/wiki/API:Main_page"},
-            "github.com": {"docs": "https://docs.github.com/en/rest"},
-            "stackoverflow.com": {"docs": "https://api.stackexchange.com/"},
-        }
-        for known, info in known_apis.items():
-            if known in domain:
-                return info
-        return None
+        return self.known_apis.lookup(domain)
 
     def _check_terms_of_service(self, domain: str) -> bool:
         # Placeholder heuristic; real implementation would consult a curated policy map
@@ -191,7 +1061,7 @@ class LegalComplianceEngine:
             rate_limit=30,
             disallowed_paths=[],
             sitemap_url=None,
-            attribution_required=(domain not in self.educational_whitelist),
+            attribution_required=not self.educational_whitelist.matches(domain),
             last_checked=datetime.utcnow(),
         )
         self.domain_rules[domain] = rules
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+"""
+Near-Duplicate Index - MinHash signatures with an LSH band index for Harvest.ai
+Syndicated and cross-posted articles differ only in boilerplate (an "originally
+published on" line, a footer, a few edits), so exact hashes miss them.
+minhash_signature() maps a page's text to a short signature whose agreement with
+another page's estimates the Jaccard similarity of their word shingles;
+NearDuplicateIndex buckets signatures by bands so a lookup only compares against
+pages that share a band, not against everything seen so far.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[int, ...]
+
+_WORD = re.compile(r"\w+")
+_EMPTY_BIN = 1 << 32
+
+
+def minhash_signature(text: str, num_perm: int = 64, shingle_words: int = 3) -> Signature:
+    """MinHash signature of ``text``'s word shingles; () for text without words.
+
+    One-permutation hashing: each shingle is hashed once, the low bits pick one of
+    ``num_perm`` bins and the bin keeps its smallest 32-bit value. Empty bins
+    (very short texts) borrow the next filled bin's value.
+    """
+    words = _WORD.findall(text.lower())
+    if not words:
+        return ()
+    mins = [_EMPTY_BIN] * num_perm
+    for i in range(max(1, len(words) - shingle_words + 1)):
+        shingle = " ".join(words[i:i + shingle_words]).encode("utf-8")
+        h = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "little")
+        slot, value = h % num_perm, h >> 32
+        if value < mins[slot]:
+            mins[slot] = value
+    for slot in range(num_perm):
+        if mins[slot] == _EMPTY_BIN:
+            for step in range(1, num_perm):
+                borrowed = mins[(slot + step) % num_perm]
+                if borrowed != _EMPTY_BIN:
+                    mins[slot] = borrowed
+                    break
+    return tuple(mins)
+
+
+def estimate_similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index of every page seen so far; persisted to ``path`` as JSON.
+
+    Pages whose estimated similarity is at least ``threshold`` are near-duplicates.
+    Signatures are split into ``bands`` bands; pages sharing any whole band become
+    candidates. With the defaults (64 values, 16 bands of 4) a pair at 0.8
+    similarity is a candidate >99.9% of the time, one at 0.3 about 12% of the time.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.signatures: Dict[str, Signature] = {}
+        # One table per band: band values -> URLs whose signature has them
+        self._tables: List[Dict[Signature, List[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._struct = struct.Struct(f"<{num_perm}I")
+        self.lookups = 0
+        self.comparisons = 0
+        if path is not None and os.path.exists(path):
+            self._load(path)
+
+    # ------------------------- Public API -------------------------
+    def signature(self, text: str) -> Signature:
+        """Signature of ``text`` with this index's settings."""
+        return minhash_signature(text, self.num_perm)
+
+    def find(self, signature: Signature, exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Most similar indexed page at or above threshold as (url, similarity), or None."""
+        if not signature:
+            return None
+        self.lookups += 1
+        best: Optional[Tuple[str, float]] = None
+        seen = set()
+        for table, band in zip(self._tables, self._bands(signature)):
+            for url in table.get(band, ()):
+                if url == exclude or url in seen:
+                    continue
+                seen.add(url)
+                self.comparisons += 1
+                similarity = estimate_similarity(signature, self.signatures[url])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (url, similarity)
+        return best
+
+    def add(self, url: str, signature: Signature) -> None:
+        if not signature:
+            return
+        previous = self.signatures.get(url)
+        if previous == signature:
+            return
+        if previous is not None:
+            self._unindex(url, previous)
+        self.signatures[url] = signature
+        for table, band in zip(self._tables, self._bands(signature)):
+            table[band].append(url)
+
+    def check(self, url: str, signature: Signature) -> Optional[str]:
+        """URL of an earlier near-duplicate of ``url``, else None (and ``url`` is indexed).
+        Re-checking a URL on a later run compares it against other pages only.
+        """
+        match = self.find(signature, exclude=url)
+        if match is not None:
+            return match[0]
+        self.add(url, signature)
+        return None
+
+    def save(self) -> None:
+        """Write the index to ``path`` atomically."""
+        if self.path is None:
+            return
+        data = {
+            "version": 1,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "signatures": {
+                url: base64.b64encode(self._struct.pack(*signature)).decode("ascii")
+                for url, signature in self.signatures.items()
+            },
+        }
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, self.path)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "pages": len(self.signatures),
+            "lookups": self.lookups,
+            "avg_comparisons": round(self.comparisons / self.lookups, 2) if self.lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    # ------------------------- Internal -------------------------
+    def _bands(self, signature: Signature) -> List[Signature]:
+        rows = self.rows
+        return [signature[i:i + rows] for i in range(0, self.num_perm, rows)]
+
+    def _unindex(self, url: str, signature: Signature) -> None:
+        for table, band in zip(self._tables, self._bands(signature)):
+            urls = table.get(band)
+            if urls and url in urls:
+                urls.remove(url)
+                if not urls:
+                    del table[band]
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable near-duplicate index %s: %s", path, exc)
+            return
+        if (data.get("version"), data.get("num_perm"), data.get("bands")) != (1, self.num_perm, self.bands):
+            logger.warning("Ignoring near-duplicate index %s built with other settings", path)
+            return
+        for url, encoded in data["signatures"].items():
+            self.add(url, self._struct.unpack(base64.b64decode(encoded)))
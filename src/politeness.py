@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+"""
+Politeness Scheduler - per-domain crawl pacing for Harvest.ai's compliance layer
+Enforces ComplianceRules.crawl_delay and ComplianceRules.rate_limit with one token
+bucket and next-allowed timestamp per domain, without blocking other domains.
+With a shared backend (see politeness_backends) the budget is shared by every
+worker process using it.
+"""
+
+import heapq
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from politeness_backends import PolitenessBackend
+
+
+@dataclass
+class DomainBucket:
+    """Token bucket plus crawl-delay gate for one domain."""
+    domain: str
+    rate_limit: int  # requests per minute; <= 0 disables the bucket
+    crawl_delay: float
+    burst: float = 1.0
+    tokens: float = 1.0
+    updated_at: float = 0.0
+    next_allowed_at: float = 0.0
+    queue: Deque[Tuple[str, float]] = field(default_factory=deque)
+    in_heap: bool = False
+    dispatched: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def ready_at(self, now: float) -> float:
+        """Earliest time the next request to this domain may start."""
+        ready = max(now, self.next_allowed_at)
+        if self.rate_limit > 0:
+            tokens = self._tokens_at(ready)
+            if tokens < 1.0:
+                ready += (1.0 - tokens) * 60.0 / self.rate_limit
+        return ready
+
+    def reserve(self, now: float) -> float:
+        """Book the next slot and return its start time."""
+        ready = self.ready_at(now)
+        if self.rate_limit > 0:
+            self.tokens = self._tokens_at(ready) - 1.0
+            self.updated_at = ready
+        self.next_allowed_at = ready + self.crawl_delay
+        self.dispatched += 1
+        return ready
+
+    def _tokens_at(self, at: float) -> float:
+        elapsed = max(0.0, at - self.updated_at)
+        return min(self.burst, self.tokens + elapsed * self.rate_limit / 60.0)
+
+
+class PolitenessScheduler:
+    """Hands out fetchable URLs across domains while honoring per-domain limits."""
+
+    def __init__(
+        self,
+        max_crawl_delay: Optional[float] = None,
+        default_rate_limit: int = 30,
+        default_crawl_delay: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        backend: Optional["PolitenessBackend"] = None,
+    ) -> None:
+        self.max_crawl_delay = max_crawl_delay
+        self.default_rate_limit = default_rate_limit
+        self.default_crawl_delay = default_crawl_delay
+        self.clock = clock
+        # Shared budget; local buckets then only order the queue and keep stats
+        self.backend = backend
+        self.buckets: Dict[str, DomainBucket] = {}
+        self._ready: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    # ------------------------- Public API -------------------------
+    def configure(self, domain: str, crawl_delay: float, rate_limit: int) -> DomainBucket:
+        """Create or update the limits for a domain (e.g. from ComplianceRules)."""
+        with self._lock:
+            return self._configure(domain, crawl_delay, rate_limit)
+
+    def add(self, url: str, crawl_delay: Optional[float] = None, rate_limit: Optional[int] = None) -> None:
+        """Queue a URL that already passed compliance checks."""
+        domain = urlparse(url).netloc
+        with self._lock:
+            bucket = self.buckets.get(domain)
+            if bucket is None or crawl_delay is not None or rate_limit is not None:
+                bucket = self._configure(
+                    domain,
+                    crawl_delay if crawl_delay is not None else (
+                        bucket.crawl_delay if bucket else self.default_crawl_delay),
+                    rate_limit if rate_limit is not None else (
+                        bucket.rate_limit if bucket else self.default_rate_limit),
+                )
+            bucket.queue.append((url, self.clock()))
+            if not bucket.in_heap:
+                self._push(bucket, self.clock())
+
+    def next_url(self) -> Tuple[Optional[str], float]:
+        """Pop the next URL whose domain is ready, without sleeping.
+        Returns (url, 0.0) when one is fetchable now, (None, seconds_until_ready)
+        when every queued domain is still waiting, or (None, 0.0) when empty.
+        """
+        with self._lock:
+            while True:
+                if not self._ready:
+                    return None, 0.0
+                now = self.clock()
+                ready_at, _, domain = self._ready[0]
+                if ready_at > now:
+                    return None, ready_at - now
+                heapq.heappop(self._ready)
+                bucket = self.buckets[domain]
+                bucket.in_heap = False
+                if bucket.ready_at(now) > now:
+                    self._push(bucket, now)  # deferred since it was queued
+                    continue
+                if self.backend is not None:
+                    # Other workers may have used the shared budget; requeue until it frees up
+                    wait = self.backend.try_acquire(domain, bucket.crawl_delay, bucket.rate_limit)
+                    if wait > 0:
+                        self._seq += 1
+                        heapq.heappush(self._ready, (now + wait, self._seq, domain))
+                        bucket.in_heap = True
+                        continue
+                break
+            bucket.reserve(now)
+            url, enqueued_at = bucket.queue.popleft()
+            waited = now - enqueued_at
+            bucket.total_wait += waited
+            bucket.max_wait = max(bucket.max_wait, waited)
+            if bucket.queue:
+                self._push(bucket, now)
+            return url, 0.0
+
+    def reserve(self, domain: str, crawl_delay: float, rate_limit: int) -> float:
+        """Book a request slot for a single fetch; returns seconds to wait before it."""
+        with self._lock:
+            bucket = self._configure(domain, crawl_delay, rate_limit)
+            if self.backend is None:
+                now = self.clock()
+                wait = bucket.reserve(now) - now
+                bucket.total_wait += wait
+                bucket.max_wait = max(bucket.max_wait, wait)
+                return wait
+            crawl_delay, rate_limit = bucket.crawl_delay, bucket.rate_limit
+        # Shared backends may do I/O; don't hold up other domains meanwhile
+        wait = self.backend.reserve(domain, crawl_delay, rate_limit)
+        with self._lock:
+            wait = max(wait, bucket.next_allowed_at - self.clock())  # defer() is local
+            bucket.dispatched += 1
+            bucket.total_wait += wait
+            bucket.max_wait = max(bucket.max_wait, wait)
+        return wait
+
+    def defer(self, domain: str, seconds: float) -> None:
+        """Hold off every request to ``domain`` for ``seconds`` (e.g. a 429/503 Retry-After)."""
+        with self._lock:
+            bucket = self.buckets.get(domain)
+            if bucket is None:
+                bucket = self._configure(domain, self.default_crawl_delay, self.default_rate_limit)
+            bucket.next_allowed_at = max(bucket.next_allowed_at, self.clock() + seconds)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(b.queue) for b in self.buckets.values())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth and wait time per domain."""
+        with self._lock:
+            now = self.clock()
+            return {
+                domain: {
+                    "queue_depth": len(b.queue),
+                    "dispatched": b.dispatched,
+                    "total_wait_s": round(b.total_wait, 3),
+                    "avg_wait_s": round(b.total_wait / b.dispatched, 3) if b.dispatched else 0.0,
+                    "max_wait_s": round(b.max_wait, 3),
+                    "next_ready_in_s": round(max(0.0, b.ready_at(now) - now), 3),
+                    "crawl_delay": b.crawl_delay,
+                    "rate_limit": b.rate_limit,
+                }
+                for domain, b in self.buckets.items()
+            }
+
+    # ------------------------- Internal -------------------------
+    def _configure(self, domain: str, crawl_delay: float, rate_limit: int) -> DomainBucket:
+        if self.max_crawl_delay is not None:
+            crawl_delay = min(crawl_delay, self.max_crawl_delay)
+        bucket = self.buckets.get(domain)
+        if bucket is None:
+            bucket = DomainBucket(domain=domain, rate_limit=rate_limit, crawl_delay=crawl_delay,
+                                  updated_at=self.clock())
+            self.buckets[domain] = bucket
+        else:
+            bucket.crawl_delay = crawl_delay
+            bucket.rate_limit = rate_limit
+        return bucket
+
+    def _push(self, bucket: DomainBucket, now: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._ready, (bucket.ready_at(now), self._seq, bucket.domain))
+        bucket.in_heap = True
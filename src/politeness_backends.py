@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+"""
+Politeness Backends - shared per-domain crawl budgets for multi-worker deployments
+A PolitenessScheduler with a shared backend books every request slot in one
+place, so N worker processes together respect a domain's crawl-delay and
+rate_limit instead of each honoring it separately (N x the intended rate).
+
+- LocalPolitenessBackend: one process (what the scheduler does by default)
+- FilePolitenessBackend: processes on one host, via fcntl-locked state files
+  (on /dev/shm when available, i.e. shared memory)
+- RedisPolitenessBackend: workers across hosts, via an atomic Lua script on any
+  Redis-compatible server; InProcessRedis is a stand-in for tests and demos
+"""
+
+import fcntl
+import hashlib
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from politeness import DomainBucket
+
+# (tokens, updated_at, next_allowed_at), wall-clock seconds so processes agree
+_STATE = struct.Struct("<ddd")
+
+
+def _book(
+    state: Optional[Tuple[float, float, float]],
+    now: float,
+    crawl_delay: float,
+    rate_limit: int,
+    book_future: bool,
+) -> Tuple[bool, float, Tuple[float, float, float]]:
+    """Shared bucket math: (booked, wait, new_state) for one reservation attempt."""
+    bucket = DomainBucket(domain="", rate_limit=rate_limit, crawl_delay=crawl_delay, updated_at=now)
+    if state is not None:
+        bucket.tokens, bucket.updated_at, bucket.next_allowed_at = state
+    ready = bucket.ready_at(now)
+    if ready > now and not book_future:
+        return False, ready - now, (bucket.tokens, bucket.updated_at, bucket.next_allowed_at)
+    bucket.reserve(now)
+    return True, ready - now, (bucket.tokens, bucket.updated_at, bucket.next_allowed_at)
+
+
+class PolitenessBackend:
+    """Books request slots against a per-domain budget shared by all its users."""
+
+    def reserve(self, domain: str, crawl_delay: float, rate_limit: int) -> float:
+        """Book the next slot (possibly in the future); returns seconds to wait."""
+        return self._acquire(domain, crawl_delay, rate_limit, book_future=True)[1]
+
+    def try_acquire(self, domain: str, crawl_delay: float, rate_limit: int) -> float:
+        """Book a slot only if one is free now: 0.0 if booked, else seconds until one is."""
+        booked, wait = self._acquire(domain, crawl_delay, rate_limit, book_future=False)
+        return 0.0 if booked else wait
+
+    def close(self) -> None:
+        pass
+
+    def _acquire(
+        self, domain: str, crawl_delay: float, rate_limit: int, book_future: bool
+    ) -> Tuple[bool, float]:
+        raise NotImplementedError
+
+
+class LocalPolitenessBackend(PolitenessBackend):
+    """In-process budget; only useful for tests or to share one budget between schedulers."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self._states: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(
+        self, domain: str, crawl_delay: float, rate_limit: int, book_future: bool
+    ) -> Tuple[bool, float]:
+        with self._lock:
+            booked, wait, state = _book(self._states.get(domain), self.clock(), crawl_delay, rate_limit, book_future)
+            self._states[domain] = state
+            return booked, wait
+
+
+class FilePolitenessBackend(PolitenessBackend):
+    """Budget shared by processes on one host: one 24-byte state file per domain,
+    read-modify-written under an exclusive flock.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_open_files: int = 256) -> None:
+        if directory is None:
+            shm = "/dev/shm"
+            directory = os.path.join(shm if os.path.isdir(shm) else "./cache", "harvest-politeness")
+        self.directory = directory
+        self.max_open_files = max_open_files
+        os.makedirs(directory, exist_ok=True)
+        self._fds: "OrderedDict[str, int]" = OrderedDict()
+        # flock excludes other processes; threads of this one share descriptors
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
+
+    def _acquire(
+        self, domain: str, crawl_delay: float, rate_limit: int, book_future: bool
+    ) -> Tuple[bool, float]:
+        with self._lock:
+            fd = self._fd(domain)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, _STATE.size, 0)
+                state = _STATE.unpack(raw) if len(raw) == _STATE.size else None
+                booked, wait, state = _book(state, time.time(), crawl_delay, rate_limit, book_future)
+                os.pwrite(fd, _STATE.pack(*state), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            return booked, wait
+
+    def _fd(self, domain: str) -> int:
+        fd = self._fds.get(domain)
+        if fd is not None:
+            self._fds.move_to_end(domain)
+            return fd
+        name = hashlib.sha1(domain.lower().encode("utf-8")).hexdigest()
+        fd = os.open(os.path.join(self.directory, f"{name}.state"), os.O_RDWR | os.O_CREAT, 0o644)
+        self._fds[domain] = fd
+        if len(self._fds) > self.max_open_files:
+            os.close(self._fds.popitem(last=False)[1])
+        return fd
+
+
+# Same math as DomainBucket.ready_at/reserve, executed atomically on the server.
+# Uses the server clock (TIME), so worker clock skew does not matter; needs Redis >= 5.
+RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local crawl_delay = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local book_future = ARGV[3] == '1'
+local s = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at', 'next_allowed_at')
+local tokens = tonumber(s[1]) or 1
+local updated = tonumber(s[2]) or now
+local next_allowed = tonumber(s[3]) or 0
+local function tokens_at(at)
+  return math.min(1, tokens + math.max(0, at - updated) * rate / 60)
+end
+local ready = math.max(now, next_allowed)
+if rate > 0 then
+  local available = tokens_at(ready)
+  if available < 1 then ready = ready + (1 - available) * 60 / rate end
+end
+if ready > now and not book_future then
+  return {0, tostring(ready - now)}
+end
+if rate > 0 then
+  tokens = tokens_at(ready) - 1
+  updated = ready
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(updated),
+           'next_allowed_at', tostring(ready + crawl_delay))
+redis.call('PEXPIRE', KEYS[1], math.ceil((ready + crawl_delay - now + 120) * 1000))
+return {1, tostring(ready - now)}
+"""
+
+
+class RedisPolitenessBackend(PolitenessBackend):
+    """Budget shared across hosts through a Redis-compatible server.
+    ``client`` needs ``register_script`` (redis.Redis, or InProcessRedis for tests).
+    """
+
+    def __init__(self, client: Any, key_prefix: str = "harvest:politeness:") -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+        self._script = client.register_script(RESERVE_SCRIPT)
+
+    def _acquire(
+        self, domain: str, crawl_delay: float, rate_limit: int, book_future: bool
+    ) -> Tuple[bool, float]:
+        booked, wait = self._script(
+            keys=[self.key_prefix + domain.lower()],
+            args=[repr(float(crawl_delay)), str(int(rate_limit)), "1" if book_future else "0"],
+        )
+        return bool(int(booked)), float(wait)
+
+
+class InProcessRedis:
+    """Stand-in for a Redis client in tests: runs RESERVE_SCRIPT's Python twin
+    under a lock. Only the politeness script is supported.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self.hashes: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def register_script(self, script: str) -> Callable[..., List[Any]]:
+        if script != RESERVE_SCRIPT:
+            raise NotImplementedError("InProcessRedis only runs the politeness reserve script")
+
+        def run(keys: List[str], args: List[str]) -> List[Any]:
+            crawl_delay, rate_limit, book_future = float(args[0]), int(args[1]), args[2] == "1"
+            with self._lock:
+                booked, wait, state = _book(
+                    self.hashes.get(keys[0]), self.clock(), crawl_delay, rate_limit, book_future
+                )
+                if booked:
+                    self.hashes[keys[0]] = state
+            return [int(booked), repr(wait)]
+
+        return run
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+"""
+Robots Matcher - compiled robots.txt rules for fast can_fetch on large rule sets
+Drop-in for urllib.robotparser.RobotFileParser as used by LegalComplianceEngine,
+with RFC 9309 semantics: longest match wins (allow on ties), "*" and "$"
+wildcards, merged groups per user agent, and a 500 KiB parse limit. Plain path
+rules live in a prefix trie; wildcard rules hang off the trie node of their
+literal prefix, so only wildcards that can apply to a path are ever evaluated.
+"""
+
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+# RFC 9309 2.5: parsers must handle at least 500 kibibytes
+MAX_ROBOTS_BYTES = 500 * 1024
+
+_SAFE_PATH_CHARS = "/:@&=+$,;!~*'()?%"
+
+
+def normalize_path(path: str) -> str:
+    """Percent-encode a path (or rule) the same way on both sides of a match."""
+    return quote(unquote(path), safe=_SAFE_PATH_CHARS)
+
+
+def product_token(user_agent: str) -> str:
+    """'Harvest.ai/1.0 (...)' -> 'harvest.ai'"""
+    return user_agent.split("/", 1)[0].split(" ", 1)[0].strip().lower()
+
+
+class _RuleSet:
+    """Compiled allow/disallow rules for one user agent."""
+
+    __slots__ = ("trie", "crawl_delay")
+
+    # Trie nodes are dicts keyed by character plus these two marker keys
+    _RULE = ""  # (length, allow) of a plain rule ending at this node
+    _WILDCARDS = "\x00"  # wildcard rules whose literal prefix ends at this node
+
+    def __init__(self, rules: Iterable[Tuple[bool, str]], crawl_delay: Optional[float]) -> None:
+        self.trie: Dict[str, object] = {}
+        for allow, pattern in rules:
+            if "*" in pattern or pattern.endswith("$"):
+                literal = re.split(r"[*$]", pattern, maxsplit=1)[0]
+                node = self._node(literal)
+                node.setdefault(self._WILDCARDS, []).append(  # type: ignore[union-attr]
+                    (len(pattern), allow, self._compile(pattern))
+                )
+            else:
+                node = self._node(pattern)
+                existing = node.get(self._RULE)
+                # Same pattern listed as both allow and disallow: allow wins
+                if existing is None or allow:
+                    node[self._RULE] = (len(pattern), allow)
+        self.crawl_delay = crawl_delay
+
+    @staticmethod
+    def _compile(pattern: str) -> "re.Pattern[str]":
+        anchored = pattern.endswith("$")
+        body = pattern[:-1] if anchored else pattern
+        regex = ".*".join(re.escape(part) for part in body.split("*"))
+        return re.compile(regex + ("$" if anchored else ""), re.DOTALL)
+
+    def _node(self, literal: str) -> Dict[str, object]:
+        node = self.trie
+        for char in literal:
+            node = node.setdefault(char, {})  # type: ignore[assignment]
+        return node
+
+    def allowed(self, path: str) -> bool:
+        """Longest matching rule wins; allow wins ties; no match means allowed."""
+        best_len, best_allow = -1, True
+        candidates: List[Tuple[int, bool, "re.Pattern[str]"]] = []
+        node: Optional[Dict[str, object]] = self.trie
+        index = 0
+        while node is not None:
+            rule = node.get(self._RULE)
+            if rule is not None:
+                best_len, best_allow = rule  # type: ignore[misc]
+            wildcards = node.get(self._WILDCARDS)
+            if wildcards:
+                candidates.extend(wildcards)  # type: ignore[arg-type]
+            if index == len(path):
+                break
+            node = node.get(path[index])  # type: ignore[assignment]
+            index += 1
+        for length, allow, regex in candidates:
+            if length > best_len or (length == best_len and allow and not best_allow):
+                if regex.match(path):
+                    best_len, best_allow = length, allow
+        return best_allow
+
+    def scope(self, path: str) -> str:
+        """Shortest prefix of path that decides allowed(path): the trie walk leaves
+        the trie at its last character, so every path starting with it gets the
+        same answer. Paths that reach a wildcard rule are returned whole.
+        """
+        node: Optional[Dict[str, object]] = self.trie
+        index = 0
+        while node is not None:
+            if node.get(self._WILDCARDS) or index == len(path):
+                return path
+            node = node.get(path[index])  # type: ignore[assignment]
+            index += 1
+        return path[:index]
+
+
+class CompiledRobots:
+    """Parsed robots.txt with the RobotFileParser methods the engine relies on."""
+
+    def __init__(self, url: str = "") -> None:
+        self.url = url
+        self.allow_all = False
+        self.disallow_all = False
+        self.last_checked = 0.0
+        self.truncated = False
+        self._groups: List[Tuple[List[str], List[Tuple[bool, str]], Optional[float]]] = []
+        self._sitemaps: List[str] = []
+        self._compiled: Dict[str, _RuleSet] = {}
+
+    # ------------------------- RobotFileParser API -------------------------
+    def set_url(self, url: str) -> None:
+        self.url = url
+
+    def mtime(self) -> float:
+        return self.last_checked
+
+    def modified(self) -> None:
+        self.last_checked = time.time()
+
+    def parse(self, lines: Iterable[str]) -> None:
+        """Parse robots.txt lines, ignoring anything past MAX_ROBOTS_BYTES."""
+        agents: List[str] = []
+        rules: List[Tuple[bool, str]] = []
+        delay: Optional[float] = None
+        in_rules = False
+        consumed = 0
+
+        def close_group() -> None:
+            if agents:
+                self._groups.append((list(agents), list(rules), delay))
+
+        for raw in lines:
+            consumed += len(raw.encode("utf-8", errors="replace")) + 1
+            if consumed > MAX_ROBOTS_BYTES:
+                self.truncated = True
+                break
+            line = raw.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            key, value = line.split(":", 1)
+            key, value = key.strip().lower(), value.strip()
+            if key == "user-agent":
+                if in_rules:
+                    close_group()
+                    agents, rules, delay, in_rules = [], [], None, False
+                agents.append(product_token(value) or value.lower())
+            elif key in ("allow", "disallow"):
+                if not agents:
+                    continue
+                in_rules = True
+                if value:  # an empty Disallow means "allow everything"
+                    rules.append((key == "allow", normalize_path(value)))
+            elif key == "crawl-delay":
+                if not agents:
+                    continue
+                in_rules = True
+                try:
+                    delay = float(value)
+                except ValueError:
+                    pass
+            elif key == "sitemap":
+                self._sitemaps.append(value)
+        close_group()
+        self._compiled.clear()
+        self.modified()
+
+    def can_fetch(self, useragent: str, url: str) -> bool:
+        if self.disallow_all:
+            return False
+        if self.allow_all:
+            return True
+        if not self.last_checked:
+            return False
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if path == "/robots.txt":
+            return True
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        return self._ruleset(useragent).allowed(normalize_path(path))
+
+    def decision_scope(self, useragent: str, url: str) -> str:
+        """Key under which can_fetch(useragent, url) can be cached: URLs of this
+        host with the same scope get the same answer ("" for the whole host).
+        """
+        if self.disallow_all or self.allow_all or not self.last_checked:
+            return ""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if path == "/robots.txt":
+            return "robots.txt"  # always allowed; other scopes start with "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        return self._ruleset(useragent).scope(normalize_path(path))
+
+    def crawl_delay(self, useragent: str) -> Optional[float]:
+        if not self.last_checked:
+            return None
+        return self._ruleset(useragent).crawl_delay
+
+    def site_maps(self) -> Optional[List[str]]:
+        return list(self._sitemaps) or None
+
+    # ------------------------- Internal -------------------------
+    def _ruleset(self, useragent: str) -> _RuleSet:
+        token = product_token(useragent)
+        ruleset = self._compiled.get(token)
+        if ruleset is None:
+            ruleset = self._compiled[token] = self._build_ruleset(token)
+        return ruleset
+
+    def _build_ruleset(self, token: str) -> _RuleSet:
+        # RFC 9309 2.2.1: a group applies when its user-agent equals our product
+        # token (case-insensitively); "bot" must not pick up "harvestbot"'s rules
+        specific = [g for g in self._groups if token in g[0]]
+        groups = specific or [g for g in self._groups if "*" in g[0]]
+        rules = [rule for group in groups for rule in group[1]]
+        delays = [group[2] for group in groups if group[2] is not None]
+        return _RuleSet(rules, delays[0] if delays else None)
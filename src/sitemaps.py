@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+"""
+Sitemaps - streaming sitemap / sitemap-index reader for Harvest.ai
+Parses XML incrementally as chunks arrive (gzip detected by magic bytes), clears
+each <url> element once read, and yields entries lazily, so a 50,000-URL sitemap
+costs roughly one chunk of memory. Sitemap indexes are followed depth-first.
+"""
+
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+
+logger = logging.getLogger(__name__)
+
+# sitemaps.org protocol limit for one (uncompressed) sitemap file
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_FEED_BYTES = 64 * 1024
+
+
+@dataclass
+class SitemapEntry:
+    url: str
+    lastmod: Optional[datetime]
+    sitemap: str  # the sitemap file the URL was listed in
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """W3C datetime ("2024-05-01", "2024-05-01T10:00:00Z", ...) -> aware datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def iter_sitemap_xml(
+    chunks: Iterable[bytes], max_bytes: int = MAX_SITEMAP_BYTES
+) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """Yield (kind, loc, lastmod) for each <url> or <sitemap> element.
+    ``kind`` is "url" for pages and "sitemap" for children of a sitemap index.
+    Input may be gzip-compressed; parsing stops after max_bytes of XML.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+
+    def drain() -> Iterator[Tuple[str, str, Optional[str]]]:
+        nonlocal root
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+            kind = _local_name(elem.tag)
+            if kind not in ("url", "sitemap") or elem is root:
+                continue
+            loc = lastmod = None
+            for child in elem:
+                name = _local_name(child.tag)
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = (child.text or "").strip()
+            if loc:
+                yield kind, loc, lastmod
+            # Drop everything parsed so far; memory stays flat however long the file is
+            root.clear()
+
+    inflate = None
+    started = False
+    received = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if not started:
+            started = True
+            if chunk[:2] == _GZIP_MAGIC:
+                inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        while chunk:
+            if inflate is not None:
+                # Inflate in bounded steps: highly compressible input can expand 1000x
+                data = inflate.decompress(chunk, _FEED_BYTES)
+                chunk = inflate.unconsumed_tail
+            else:
+                data, chunk = chunk, b""
+            received += len(data)
+            if received > max_bytes:
+                logger.warning("Sitemap exceeds %d bytes; ignoring the rest", max_bytes)
+                return
+            parser.feed(data)
+            yield from drain()
+    if inflate is not None:
+        parser.feed(inflate.flush())
+    parser.close()
+    yield from drain()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapReader:
+    """Lazily walks sitemaps and sitemap indexes, yielding page URLs with lastmod.
+
+    ``open_sitemap(url)`` returns the body as an iterable of byte chunks; the
+    compliance engine supplies one that checks robots.txt and paces requests.
+    """
+
+    def __init__(
+        self,
+        open_sitemap: Callable[[str], Iterable[bytes]],
+        max_depth: int = 3,
+        max_sitemaps: int = 1000,
+        max_bytes: int = MAX_SITEMAP_BYTES,
+    ) -> None:
+        self.open_sitemap = open_sitemap
+        self.max_depth = max_depth
+        self.max_sitemaps = max_sitemaps
+        self.max_bytes = max_bytes
+
+    def iter_entries(
+        self, sitemap_urls: Iterable[str], since: Optional[datetime] = None
+    ) -> Iterator[SitemapEntry]:
+        """Yield entries from every reachable sitemap, skipping ones older than ``since``.
+        Unreadable sitemaps are logged and skipped.
+        """
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        pending: List[Tuple[str, int]] = [(url, 0) for url in reversed(list(sitemap_urls))]
+        seen: Set[str] = set()
+        while pending and len(seen) < self.max_sitemaps:
+            sitemap_url, depth = pending.pop()
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            children: List[Tuple[str, int]] = []
+            try:
+                for kind, loc, lastmod in iter_sitemap_xml(self.open_sitemap(sitemap_url), self.max_bytes):
+                    modified = parse_lastmod(lastmod)
+                    if since is not None and modified is not None and modified < since:
+                        continue
+                    if kind == "sitemap":
+                        if depth < self.max_depth:
+                            children.append((loc, depth + 1))
+                    else:
+                        yield SitemapEntry(url=loc, lastmod=modified, sitemap=sitemap_url)
+            except (ParseError, zlib.error) as exc:
+                logger.warning("Malformed sitemap %s: %s", sitemap_url, exc)
+            except Exception as exc:
+                logger.warning("Could not read sitemap %s: %s", sitemap_url, exc)
+            # Children in document order
+            pending.extend(reversed(children))
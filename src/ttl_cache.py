@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+"""
+TTL Cache - bounded, thread-safe LRU mapping with per-entry expiry for Harvest.ai
+Backs the compliance decision cache and the per-domain robots/rules caches so long
+crawls over many hosts keep a fixed memory footprint. Entries can be grouped (e.g.
+by host) for targeted invalidation; hits, misses, expirations, evictions and
+invalidations are counted for monitoring.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+_MISSING = object()
+
+
+class TTLCache(MutableMapping):
+    """LRU mapping capped at ``max_entries``; entries expire after ``ttl`` seconds.
+
+    ``ttl=None`` disables expiry (pure LRU). ``group`` maps a key to a group id
+    so ``invalidate_group`` can drop every entry of, say, one host at once.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = None,
+        group: Optional[Callable[[Any], Hashable]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._group = group
+        self._clock = clock
+        # key -> (value, expires_at or None); most recently used last
+        self._data: "OrderedDict[Any, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._groups: Dict[Hashable, Set[Any]] = {}
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidated": 0,
+        }
+
+    # ------------------------- Mapping API -------------------------
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.counters["misses"] += 1
+                return default
+            value, expires_at = entry  # type: ignore[misc]
+            if expires_at is not None and self._clock() >= expires_at:
+                self._remove(key)
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self.counters["hits"] += 1
+            return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value``; ``ttl`` overrides the cache-wide TTL for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            elif self._group is not None:
+                self._groups.setdefault(self._group(key), set()).add(key)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.max_entries:
+                self._remove(next(iter(self._data)))
+                self.counters["evicted"] += 1
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        with self._lock:
+            if key not in self._data:
+                raise KeyError(key)
+            self._remove(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Membership test that honours expiry but does not touch LRU order or counters."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return False
+            expires_at = entry[1]  # type: ignore[index]
+            return expires_at is None or self._clock() < expires_at
+
+    def peek(self, key: Any, default: Any = None) -> Any:
+        """Like get, but does not touch LRU order or counters."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry  # type: ignore[misc]
+            if expires_at is not None and self._clock() >= expires_at:
+                return default
+            return value
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._lock:
+            keys: List[Any] = list(self._data)
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ------------------------- Invalidation -------------------------
+    def invalidate(self, key: Any) -> bool:
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._remove(key)
+            self.counters["invalidated"] += 1
+            return True
+
+    def invalidate_group(self, group_id: Hashable) -> int:
+        """Drop every entry whose key maps to ``group_id``; returns how many."""
+        with self._lock:
+            keys = list(self._groups.get(group_id, ()))
+            for key in keys:
+                self._remove(key)
+            self.counters["invalidated"] += len(keys)
+            return len(keys)
+
+    def invalidate_groups(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every group for which ``predicate(group_id)`` is true."""
+        with self._lock:
+            group_ids = [g for g in self._groups if predicate(g)]
+        return sum(self.invalidate_group(g) for g in group_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.counters["invalidated"] += len(self._data)
+            self._data.clear()
+            self._groups.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "hit_ratio": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+    # ------------------------- Internal -------------------------
+    def _remove(self, key: Any) -> None:
+        """Delete ``key`` and its group membership; caller holds the lock."""
+        del self._data[key]
+        if self._group is not None:
+            group_id = self._group(key)
+            members = self._groups.get(group_id)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._groups[group_id]
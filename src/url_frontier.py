@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+"""
+URL Frontier - canonical URL normalization and crawl deduplication for Harvest.ai
+normalize_url() maps the many spellings of one page (fragments, tracking params,
+default ports, trailing slashes, host case, percent-encoding case, parameter
+order) to one key; the response cache keys entries by it too. UrlFrontier
+remembers every key it has handed out, in an exact set for small jobs or a Bloom
+filter (fixed memory, configurable false-positive rate, bit array persisted to
+disk) for multi-million-URL jobs.
+"""
+
+import hashlib
+import math
+import os
+import re
+import string
+import struct
+import sys
+import threading
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Set, Union
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+# Query parameters that only identify a campaign, click or referrer on any site
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+})
+TRACKING_PREFIXES = ("utm_",)
+
+# Referral parameters that are only noise on their own site (and its subdomains);
+# elsewhere "source" or "sk" may well select content
+SITE_TRACKING_PARAMS: Mapping[str, FrozenSet[str]] = {
+    "medium.com": frozenset({"source", "sk"}),
+    "twitter.com": frozenset({"ref_src", "ref_url"}),
+    "x.com": frozenset({"ref_src", "ref_url"}),
+}
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_PERCENT_ESCAPE = re.compile(r"%[0-9a-fA-F]{2}")
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+
+
+def normalize_url(
+    url: str,
+    drop_params: Iterable[str] = TRACKING_PARAMS,
+    site_params: Mapping[str, Iterable[str]] = SITE_TRACKING_PARAMS,
+) -> str:
+    """Canonical form of an absolute http(s) URL, for deduplication and cache keys.
+    Kept query parameters are sorted but otherwise left as they were encoded.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = f"[{host}]" if ":" in host else host  # IPv6 literal
+    if port not in (None, _DEFAULT_PORTS.get(scheme)):
+        netloc = f"{netloc}:{port}"
+
+    path = _normalize_path(parts.path)
+    query = ""
+    if parts.query:
+        dropped = drop_params if isinstance(drop_params, (set, frozenset)) else frozenset(drop_params)
+        for site, params in site_params.items():
+            if host == site or host.endswith("." + site):
+                dropped = dropped.union(params)
+        query = "&".join(sorted(_kept_query_pairs(parts.query, dropped)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class ExactSeenSet:
+    """Exact membership over normalized URLs; memory grows with the URLs themselves."""
+
+    kind = "exact"
+
+    def __init__(self) -> None:
+        self._items: Set[str] = set()
+
+    def add(self, key: str) -> bool:
+        """Insert; True if ``key`` was not there yet."""
+        if key in self._items:
+            return False
+        self._items.add(key)
+        return True
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._items) + sum(sys.getsizeof(item) for item in self._items)
+
+    def save(self) -> None:
+        pass
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` items at ``fp_rate``.
+    With ``path`` the bit array is loaded from / saved to that file.
+    """
+
+    kind = "bloom"
+    _HEADER = struct.Struct("<8sQQQd")  # magic, bits, hashes, items, fp_rate
+    _MAGIC = b"HVBLOOM1"
+
+    def __init__(self, capacity: int, fp_rate: float = 0.001, path: Optional[str] = None) -> None:
+        if capacity <= 0 or not 0 < fp_rate < 1:
+            raise ValueError("BloomFilter needs capacity > 0 and 0 < fp_rate < 1")
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.path = path
+        self.num_bits = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        if path is not None and os.path.exists(path):
+            self._load(path)
+
+    def add(self, key: str) -> bool:
+        """Insert; True if ``key`` was (probably) not there yet."""
+        bits = self._bits
+        new = False
+        for index in self._indexes(key):
+            byte, mask = index >> 3, 1 << (index & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key: object) -> bool:
+        bits = self._bits
+        return all(bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(str(key)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def estimated_fp_rate(self) -> float:
+        """False-positive rate at the current fill level."""
+        filled = bin(int.from_bytes(self._bits, "little")).count("1") / self.num_bits
+        return filled ** self.num_hashes
+
+    def save(self) -> None:
+        """Write the bit array to ``path`` atomically."""
+        if self.path is None:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(tmp, "wb") as fh:
+            fh.write(self._HEADER.pack(self._MAGIC, self.num_bits, self.num_hashes, self.count, self.fp_rate))
+            fh.write(self._bits)
+        os.replace(tmp, self.path)
+
+    # ------------------------- Internal -------------------------
+    def _indexes(self, key: str) -> Iterable[int]:
+        # Double hashing (Kirsch-Mitzenmacher): k indexes from one 128-bit digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def _load(self, path: str) -> None:
+        with open(path, "rb") as fh:
+            header = fh.read(self._HEADER.size)
+            magic, num_bits, num_hashes, count, _ = self._HEADER.unpack(header)
+            if magic != self._MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            if (num_bits, num_hashes) != (self.num_bits, self.num_hashes):
+                raise ValueError(
+                    f"{path} was sized for different capacity/fp_rate "
+                    f"({num_bits} bits, {num_hashes} hashes vs {self.num_bits}, {self.num_hashes})"
+                )
+            bits = fh.read()
+        if len(bits) != len(self._bits):
+            raise ValueError(f"{path} is truncated")
+        self._bits = bytearray(bits)
+        self.count = count
+
+
+class UrlFrontier:
+    """Normalizes URLs and admits each canonical URL once.
+
+    ``expected_urls`` up to ``exact_limit`` use an exact set; larger jobs use a
+    Bloom filter with ``fp_rate`` (a false positive skips a URL that was never
+    seen; it never queues a duplicate). ``path`` persists the Bloom filter.
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        expected_urls: int = 10_000,
+        fp_rate: float = 0.001,
+        path: Optional[str] = None,
+        exact_limit: int = 100_000,
+        drop_params: Iterable[str] = TRACKING_PARAMS,
+        site_params: Mapping[str, Iterable[str]] = SITE_TRACKING_PARAMS,
+    ) -> None:
+        self.drop_params = frozenset(drop_params)
+        self.site_params = {site: frozenset(params) for site, params in site_params.items()}
+        self.seen: Union[ExactSeenSet, BloomFilter]
+        if expected_urls <= exact_limit and path is None:
+            self.seen = ExactSeenSet()
+        else:
+            self.seen = BloomFilter(expected_urls, fp_rate, path)
+        self.offered = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    def add(self, url: str) -> Optional[str]:
+        """Canonical URL if it has not been seen before, else None."""
+        key = normalize_url(url, self.drop_params, self.site_params)
+        with self._lock:
+            self.offered += 1
+            if self.seen.add(key):
+                return key
+            self.duplicates += 1
+            return None
+
+    def __contains__(self, url: object) -> bool:
+        return normalize_url(str(url), self.drop_params, self.site_params) in self.seen
+
+    def __len__(self) -> int:
+        return len(self.seen)
+
+    def save(self) -> None:
+        with self._lock:
+            self.seen.save()
+
+    def stats(self) -> Dict[str, Union[str, int, float]]:
+        stats: Dict[str, Union[str, int, float]] = {
+            "kind": self.seen.kind,
+            "urls": len(self.seen),
+            "offered": self.offered,
+            "duplicates": self.duplicates,
+            "memory_bytes": self.seen.memory_bytes(),
+        }
+        if isinstance(self.seen, BloomFilter):
+            stats["capacity"] = self.seen.capacity
+            stats["fp_rate_target"] = self.seen.fp_rate
+            stats["fp_rate_estimate"] = round(self.seen.estimated_fp_rate(), 6)
+        return stats
+
+
+# ------------------------- Internal -------------------------
+def _normalize_escape(match: "re.Match[str]") -> str:
+    # "%7e" -> "~" (needs no escaping), "%2f" -> "%2F" (meaningful, keep escaped)
+    char = chr(int(match.group(0)[1:], 16))
+    return char if char in _UNRESERVED else match.group(0).upper()
+
+
+def _kept_query_pairs(query: str, dropped: FrozenSet[str]) -> Iterable[str]:
+    # Raw "key=value" pairs, so "+" vs "%20" and other encodings survive as sent
+    for pair in query.split("&"):
+        if not pair:
+            continue
+        if "%" in pair:
+            pair = _PERCENT_ESCAPE.sub(_normalize_escape, pair)
+        key = unquote_plus(pair.split("=", 1)[0]).lower()
+        if key not in dropped and not key.startswith(TRACKING_PREFIXES):
+            yield pair
+
+
+def _normalize_path(path: str) -> str:
+    if not path:
+        return "/"
+    if "%" in path:
+        path = _PERCENT_ESCAPE.sub(_normalize_escape, path)
+    segments = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != ".":
+            segments.append(segment)
+    path = "/".join(segments) or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+    return path if path.startswith("/") else "/" + path